@@ -3,265 +3,259 @@ This file contains functions to extract FERC Form 6 schedules and statements fro
 PUDL ferc6_xbrl.sqlite database.
 '''
 
-import sqlite3
-import pandas as pd
+from collections import namedtuple
+
+from ferc_cache import cached_statement
+from ferc_metrics import instrumented
+from ferc_sqlite import FercReader, extract_statement, iter_statement, read_statements
+from ferc_statements import form_tables, get_statement_spec
+
+
+# The statements of this form, as registered in ferc_statements
+INCOME_STATEMENT_SPEC = get_statement_spec('ferc6', 'income_statement')
+BALANCE_SHEET_SPEC = get_statement_spec('ferc6', 'balance_sheet')
+CASH_FLOW_STATEMENT_SPEC = get_statement_spec('ferc6', 'cash_flow_statement')
+
+
+# Tables the getters in this file read from
+SQL_TABLES = form_tables('ferc6')
+
+
+# Columns of each statement, in statement order
+INCOME_STATEMENT_ITEMS = INCOME_STATEMENT_SPEC.columns
+BALANCE_SHEET_ITEMS = BALANCE_SHEET_SPEC.columns
+CASH_FLOW_STATEMENT_ITEMS = CASH_FLOW_STATEMENT_SPEC.columns
 
 
 # Extract the Income Statement
-def get_ferc6_income_statement(db_file, subject_id):
+@instrumented
+@cached_statement
+def get_ferc6_income_statement(db_file, subject_id, latest=False, compact=False):
     '''
     Extract the Income Statement out of a PUDL FERC Form 6 SQLite file.
     See the SQLite datasette section at:
     https://catalystcoop-pudl.readthedocs.io/en/latest/data_access.html
     
     Parameters:
-        db_file (object): Path to PUDL FERC Form 6 sqlite database file
-        subject_id (string): the entity_id to filter the database by
+        db_file (object): Path to PUDL FERC Form 6 sqlite database file,
+            or an open sqlite3 connection
+        subject_id (string or iterable): the entity_id, or an iterable of
+            entity_ids, to filter the database by. None returns every entity
+        latest (bool): return only the latest publication_time for each
+            reporting period, dropping superseded filings
+        compact (bool): return categoricals, datetimes and downcast numbers
+            instead of the dtypes pd.read_sql infers
 
     Returns:
         DataFrame (object): A Pandas DataFrame of the filtered Income Statement
     '''
-    # Connect to the sql database using sqlite3
-    conn = sqlite3.connect(db_file)
+    return extract_statement(db_file, INCOME_STATEMENT_SPEC, subject_id, latest, compact)
 
-    # Query the database file and assign to pandas dataframe
-    sql_table = 'income_statement_114_duration'
-    sql_query = f'SELECT * FROM {sql_table}'
-    df = pd.read_sql(sql_query + " WHERE entity_id = ?", conn, params=(subject_id,))
-    
-    # Close the database connection
-    conn.close()
-
-    # Rearrange columns to match income statement format
-    income_statement_items = (
-        'entity_id',
-        'filing_name',
-        'publication_time',
-        'start_date',
-        'end_date',
-        'operating_revenues', 
-        'operating_expenses',
-        'net_carrier_operating_income',
-        'other_income_and_deductions',
-        'income_net_from_noncarrier_property',
-        'interest_and_dividend_income',
-        'miscellaneous_income',
-        'unusual_or_infrequent_items_credit',
-        'interest_expense',
-        'miscellaneous_income_charges',
-        'unusual_or_infrequent_items_debit',
-        'dividend_income_equity_investments',
-        'undistributed_earnings_losses',
-        'equity_in_earnings_losses_of_affiliated_companies_including_dividend_income',
-        'other_income_and_deductions',
-        'ordinary_income_before_federal_income_taxes',
-        'federal_income_taxes_on_income_from_continuing_operations',
-        'provision_for_deferred_taxes',
-        'income_loss_from_continuing_operations',
-        'income_loss_from_operations_of_discontinued_segments_less_applicable_income_taxes',
-        'gain_loss_from_disposition_of_discontinued_segments_less_applicable_income_taxes',
-        'income_loss_from_discontinued_operations',
-        'income_loss_before_extraordinary_items',
-        'extraordinary_items_net',
-        'income_taxes_on_extraordinary_items',
-        'provision_for_deferred_taxes_extraordinary_items',
-        'extraordinary_items',
-        'cumulative_effect_of_changes_in_accounting_principles_less_applicable_income_taxes',
-        'extraordinary_items_and_accounting_changes',
-        'net_income_loss'
+
+# Stream the Income Statement in chunks
+def iter_ferc6_income_statement(
+    db_file, subject_id=None, chunksize=10000, latest=False, compact=False
+):
+    '''
+    Stream the Income Statement out of a PUDL FERC Form 6 SQLite file in chunks of
+    at most chunksize rows, so whole tables can be processed at constant memory.
+
+    Parameters:
+        db_file (object): Path to PUDL FERC Form 6 sqlite database file,
+            or an open sqlite3 connection
+        subject_id (string or iterable): the entity_id, or an iterable of
+            entity_ids, to filter the database by. None streams every entity
+        chunksize (int): the maximum number of rows per DataFrame
+        latest (bool): stream only the latest publication_time for each
+            reporting period, dropping superseded filings
+        compact (bool): return categoricals, datetimes and downcast numbers
+            instead of the dtypes pd.read_sql infers
+
+    Yields:
+        DataFrame (object): Pandas DataFrames of consecutive rows of the Income Statement
+    '''
+    yield from iter_statement(
+        db_file, INCOME_STATEMENT_SPEC, subject_id, chunksize, latest, compact
     )
-    
-    df = df.loc[:, income_statement_items]
-    
-    return df
+
 
 # Extract the Balance Sheet
-def get_ferc6_balance_sheet(db_file, subject_id):
+@instrumented
+@cached_statement
+def get_ferc6_balance_sheet(db_file, subject_id, latest=False, compact=False):
     '''
     Extract the Balance Sheet out of a PUDL FERC Form 6 SQLite file.
     See the SQLite datasette section at:
     https://catalystcoop-pudl.readthedocs.io/en/latest/data_access.html
 
     Parameters:
-        db_file (object): Path to PUDL FERC Form 6 sqlite database file
-        subject_id (string): the entity_id to filter the database by
+        db_file (object): Path to PUDL FERC Form 6 sqlite database file,
+            or an open sqlite3 connection
+        subject_id (string or iterable): the entity_id, or an iterable of
+            entity_ids, to filter the database by. None returns every entity
+        latest (bool): return only the latest publication_time for each
+            reporting period, dropping superseded filings
+        compact (bool): return categoricals, datetimes and downcast numbers
+            instead of the dtypes pd.read_sql infers
 
     Returns:
         DataFrame (object): A Pandas DataFrame of the filtered Balance Sheet
     '''
-    # Connect to the sql database using sqlite3
-    conn = sqlite3.connect(db_file)
+    return extract_statement(db_file, BALANCE_SHEET_SPEC, subject_id, latest, compact)
+
+
+# Stream the Balance Sheet in chunks
+def iter_ferc6_balance_sheet(
+    db_file, subject_id=None, chunksize=10000, latest=False, compact=False
+):
+    '''
+    Stream the Balance Sheet out of a PUDL FERC Form 6 SQLite file in chunks of
+    at most chunksize rows, so whole tables can be processed at constant memory.
+
+    Parameters:
+        db_file (object): Path to PUDL FERC Form 6 sqlite database file,
+            or an open sqlite3 connection
+        subject_id (string or iterable): the entity_id, or an iterable of
+            entity_ids, to filter the database by. None streams every entity
+        chunksize (int): the maximum number of rows per DataFrame
+        latest (bool): stream only the latest publication_time for each
+            reporting period, dropping superseded filings
+        compact (bool): return categoricals, datetimes and downcast numbers
+            instead of the dtypes pd.read_sql infers
+
+    Yields:
+        DataFrame (object): Pandas DataFrames of consecutive rows of the Balance Sheet
+    '''
+    yield from iter_statement(db_file, BALANCE_SHEET_SPEC, subject_id, chunksize, latest, compact)
 
-    # Query the database file and assign to pandas dataframe
-    sql_table = 'comparative_balance_sheet_110_instant'
-    sql_query = f'SELECT * FROM {sql_table}'
-    df = pd.read_sql(sql_query + " WHERE entity_id = ?", conn, params=(subject_id,))
-    
-    # Close the database connection
-    conn.close()
-
-    # Rearrange columns to match balance sheet format
-    balance_sheet_items = (
-        'entity_id',
-        'filing_name',
-        'publication_time',
-        'date',
-        'cash',
-        'special_deposits',
-        'temporary_investments',
-        'notes_receivable',
-        'receivables_from_affiliated_companies',
-        'accounts_receivable',
-        'accumulated_provision_for_uncollectible_accounts',
-        'interest_and_dividends_receivable',
-        'oil_inventory',
-        'material_and_supplies',
-        'prepayments',
-        'other_current_assets',
-        'deferred_income_tax_assets',
-        'current_assets',
-        'investments_in_affiliated_companies_stocks',
-        'investment_in_affiliated_companies_bonds',
-        'investments_in_affiliated_companies_other_secured_obligations',
-        'investments_in_affiliated_companies_unsecured_notes',
-        'investments_in_affiliated_companies_investment_advances',
-        'investments_in_affiliated_companies_undistributed_earnings_from_certain_investments',
-        'other_investments_stocks',
-        'other_investments_bonds',
-        'other_investments_other_secured_obligations',
-        'other_investments_unsecured_notes',
-        'other_investments_investment_advances',
-        'sinking_and_other_funds',
-        'investments_and_special_funds',
-        'carrier_property',
-        'accrued_depreciation_carrier_property',
-        'accrued_amortization_carrier_property',
-        'carrier_property_net',
-        'operating_oil_supply',
-        'noncarrier_property',
-        'accrued_depreciation_noncarrier_property',
-        'noncarrier_property_net',
-        'tangible_property',
-        'organization_costs_and_other_intangibles',
-        'accrued_amortization_of_intangibles',
-        'miscellaneous_other_assets',
-        'other_deferred_charges',
-        'accumulated_deferred_income_tax_assets',
-        'derivative_instrument_assets',
-        'derivative_instrument_assets_hedges',
-        'other_assets_and_deferred_charges',
-        'assets',
-        'notes_payable',
-        'payables_to_affiliated_companies',
-        'accounts_payable',
-        'salaries_and_wages_payable',
-        'interest_payable',
-        'dividends_payable',
-        'taxes_payable',
-        'long_term_debt_payable_within_one_year',
-        'other_current_liabilities',
-        'deferred_income_tax_liabilities',
-        'current_liabilities',
-        'long_term_debt_payable_after_one_year',
-        'unamortized_premium_on_long_term_debt',
-        'unamortized_discount_on_long_term_debt_debit',
-        'other_noncurrent_liabilities',
-        'accumulated_deferred_income_tax_liabilities',
-        'derivative_instrument_liabilities',
-        'derivative_instrument_liabilities_hedges',
-        'asset_retirement_obligations',
-        'noncurrent_liabilities',
-        'liabilities',
-        'capital_stock',
-        'premiums_on_capital_stock',
-        'capital_stock_subscriptions',
-        'additional_paid_in_capital',
-        'appropriated_retained_income',
-        'unappropriated_retained_income_and_equity_in_undistributed_earnings_losses_of_affiliated_company',
-        'treasury_stock',
-        'accumulated_other_comprehensive_income',
-        'stockholders_equity',
-        'liabilities_and_stockholders_equity'
-    )
-    
-    df = df.loc[:, balance_sheet_items]
-    
-    return df
 
 # Extract the Cash Flow Statement
-def get_ferc6_cash_flow_statement(db_file, subject_id):
+@instrumented
+@cached_statement
+def get_ferc6_cash_flow_statement(db_file, subject_id, latest=False, compact=False):
     '''
     Extract the Statement of Cash FLows out of a PUDL FERC Form 6 SQLite file.
     See the SQLite datasette section at:
     https://catalystcoop-pudl.readthedocs.io/en/latest/data_access.html
 
     Parameters:
-        db_file (object): Path to PUDL FERC Form 6 sqlite database file
-        subject_id (string): the entity_id to filter the database by
+        db_file (object): Path to PUDL FERC Form 6 sqlite database file,
+            or an open sqlite3 connection
+        subject_id (string or iterable): the entity_id, or an iterable of
+            entity_ids, to filter the database by. None returns every entity
+        latest (bool): return only the latest publication_time for each
+            reporting period, dropping superseded filings
+        compact (bool): return categoricals, datetimes and downcast numbers
+            instead of the dtypes pd.read_sql infers
 
     Returns:
         DataFrame (object): A Pandas DataFrame of the filtered Statement of Cash Flows
     '''
-    # Connect to the sql database using sqlite3
-    conn = sqlite3.connect(db_file)
+    return extract_statement(db_file, CASH_FLOW_STATEMENT_SPEC, subject_id, latest, compact)
 
-    # Query the database file and assign to pandas dataframe
-    sql_table = 'statement_of_cash_flows_120_duration'
-    sql_query = f'SELECT * FROM {sql_table}'
-    df = pd.read_sql(sql_query + " WHERE entity_id = ?", conn, params=(subject_id,))
-    
-    # Close the database connection
-    conn.close()
-
-    # Rearrange columns to match cash flow statement format
-    cash_flow_statement_items = (
-        'entity_id',
-        'filing_name',
-        'publication_time',
-        'start_date',
-        'end_date',
-        'net_income_loss',
-        'depreciation_and_depletion',
-        'amortization',
-        'noncash_adjustments_to_cash_flows_from_operating_activities',
-        'deferred_income_taxes_net',
-        'net_increase_decrease_in_receivables_operating_activities',
-        'net_increase_decrease_in_inventory_operating_activities',
-        'net_increase_decrease_in_payables_and_accrued_expenses_operating_activities',
-        'other_adjustments_to_cash_flows_from_operating_activities',
-        'net_cash_provided_by_used_in_operating_activities',
-        'gross_additions_to_carrier_property_investment_activities',
-        'gross_additions_to_noncarrier_property_investment_activities',
-        'other_construction_and_acquisition_of_plant_investment_activities',
-        'cash_outflows_for_plant',
-        'acquisition_of_other_noncurrent_assets',
-        'proceeds_from_disposal_of_noncurrent_assets',
-        'investments_in_and_advances_to_associated_and_subsidiary_companies',
-        'contributions_and_advances_from_associated_and_subsidiary_companies',
-        'disposition_of_investments_in_and_advances_to_associated_and_subsidiary_companies',
-        'purchase_of_investment_securities',
-        'proceeds_from_sales_of_investment_securities',
-        'loans_made_or_purchased',
-        'collections_on_loans',
-        'net_increase_decrease_in_receivables_investing_activities',
-        'net_increase_decrease_in_inventory_investing_activities',
-        'net_increase_decrease_in_payables_and_accrued_expenses_investing_activities',
-        'other_adjustments_to_cash_flows_from_investment_activities',
-        'cash_flows_provided_from_used_in_investment_activities',
-        'proceeds_from_issuance_of_long_term_debt_financing_activities',
-        'proceeds_from_issuance_of_capital_stock',
-        'other_adjustments_by_outside_sources_to_cash_flows_from_financing_activities',
-        'other_adjustment_by_short_term_debt_to_cash_flows_from_financing_activities',
-        'cash_provided_by_outside_sources',
-        'payments_for_retirement_of_long_term_debt_financing_activities',
-        'payment_for_retirement_of_capital_stock',
-        'other_retirements_of_balances_impacting_cash_flows_from_financing_activities',
-        'net_decrease_in_short_term_debt',
-        'dividends_on_capital_stock',
-        'other_adjustments_to_cash_flows_from_financing_activities',
-        'cash_flows_provided_from_used_in_financing_activities',
-        'net_increase_decrease_in_cash_and_cash_equivalents')
-    
-    df = df.loc[:, cash_flow_statement_items]
-    
-    return df
\ No newline at end of file
+
+# Stream the Cash Flow Statement in chunks
+def iter_ferc6_cash_flow_statement(
+    db_file, subject_id=None, chunksize=10000, latest=False, compact=False
+):
+    '''
+    Stream the Cash Flow Statement out of a PUDL FERC Form 6 SQLite file in chunks of
+    at most chunksize rows, so whole tables can be processed at constant memory.
+
+    Parameters:
+        db_file (object): Path to PUDL FERC Form 6 sqlite database file,
+            or an open sqlite3 connection
+        subject_id (string or iterable): the entity_id, or an iterable of
+            entity_ids, to filter the database by. None streams every entity
+        chunksize (int): the maximum number of rows per DataFrame
+        latest (bool): stream only the latest publication_time for each
+            reporting period, dropping superseded filings
+        compact (bool): return categoricals, datetimes and downcast numbers
+            instead of the dtypes pd.read_sql infers
+
+    Yields:
+        DataFrame (object): Pandas DataFrames of consecutive rows of the Cash Flow Statement
+    '''
+    yield from iter_statement(
+        db_file, CASH_FLOW_STATEMENT_SPEC, subject_id, chunksize, latest, compact
+    )
+
+
+# Getters by statement name
+STATEMENTS = {
+    'income_statement': get_ferc6_income_statement,
+    'balance_sheet': get_ferc6_balance_sheet,
+    'cash_flow_statement': get_ferc6_cash_flow_statement,
+}
+
+
+# Tables by statement name
+STATEMENT_TABLES = {
+    name: get_statement_spec('ferc6', name).table for name in STATEMENTS
+}
+
+
+# One filer's statements, as returned by get_ferc6_financial_package
+Ferc6FinancialPackage = namedtuple('Ferc6FinancialPackage', STATEMENTS)
+
+
+# Extract every statement at once
+@instrumented
+def get_ferc6_financial_package(
+    db_file, subject_id, latest=False, max_workers=None, compact=False
+):
+    '''
+    Extract the Income Statement, Balance Sheet and Cash Flow Statement out of
+    a PUDL FERC Form 6 SQLite file in one go.
+    All statements are read on one connection inside one read transaction, so
+    they come from the same database snapshot.
+
+    Parameters:
+        db_file (object): Path to PUDL FERC Form 6 sqlite database file,
+            or an open sqlite3 connection
+        subject_id (string or iterable): the entity_id, or an iterable of
+            entity_ids, to filter the database by. None returns every entity
+        latest (bool): return only the latest publication_time for each
+            reporting period, dropping superseded filings
+        max_workers (int): run the statement queries concurrently on this many
+            threads, each with its own connection. Needs db_file to be a path
+        compact (bool): return categoricals, datetimes and downcast numbers
+            instead of the dtypes pd.read_sql infers
+
+    Returns:
+        Ferc6FinancialPackage (object): A named tuple with a Pandas DataFrame per statement
+    '''
+    statements = read_statements(db_file, STATEMENTS, subject_id, latest, max_workers, compact)
+
+    return Ferc6FinancialPackage(**statements)
+
+
+# Chunked iterators by statement name
+STATEMENT_ITERATORS = {
+    'income_statement': iter_ferc6_income_statement,
+    'balance_sheet': iter_ferc6_balance_sheet,
+    'cash_flow_statement': iter_ferc6_cash_flow_statement,
+}
+
+
+# Reuse one connection per thread across getter calls
+class Ferc6Reader(FercReader):
+    '''
+    Keep a PUDL FERC Form 6 SQLite file open and expose the getters as methods.
+    See FercReader for the connection handling.
+
+    Parameters:
+        db_file (object): Path to PUDL FERC Form 6 sqlite database file
+    '''
+
+    def get_income_statement(self, subject_id, latest=False, compact=False):
+        return get_ferc6_income_statement(self.connection, subject_id, latest, compact=compact)
+
+    def get_balance_sheet(self, subject_id, latest=False, compact=False):
+        return get_ferc6_balance_sheet(self.connection, subject_id, latest, compact=compact)
+
+    def get_cash_flow_statement(self, subject_id, latest=False, compact=False):
+        return get_ferc6_cash_flow_statement(self.connection, subject_id, latest, compact=compact)
+
+    def get_financial_package(self, subject_id, latest=False, compact=False):
+        return get_ferc6_financial_package(self.connection, subject_id, latest, compact=compact)
@@ -0,0 +1,178 @@
+'''
+This file contains asyncio counterparts of the FERC Form 2 and Form 6 statement
+getters, e.g. await aget_ferc6_income_statement(db_file, subject_id).
+
+The blocking getters run on a shared, bounded thread pool, so at most
+MAX_CONCURRENCY queries run at once and the event loop is never blocked. Every
+database file gets one FercReader, so each pool thread keeps its own open
+connection to it. Cancelling an awaiting task interrupts its SQLite query.
+
+Many entities can be fetched concurrently with asyncio.gather:
+
+    frames = await asyncio.gather(
+        *(aget_ferc6_balance_sheet('ferc6_xbrl.sqlite', entity_id) for entity_id in entity_ids)
+    )
+'''
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import ferc2_extracts
+import ferc6_extracts
+from ferc_sqlite import FercReader
+
+
+# The number of queries that may run at the same time
+MAX_CONCURRENCY = 8
+
+_executor = None
+_readers = {}
+_lock = threading.Lock()
+
+
+# Change the concurrency limit
+def set_max_concurrency(max_concurrency):
+    '''
+    Set the number of getter calls that may run at the same time. Calls already
+    running finish on the previous thread pool.
+
+    Parameters:
+        max_concurrency (int): the size of the thread pool
+    '''
+    global MAX_CONCURRENCY, _executor
+    with _lock:
+        MAX_CONCURRENCY = max_concurrency
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False)
+
+
+# Close the pooled connections and threads
+def close():
+    '''Shut down the thread pool and close every pooled connection.'''
+    global _executor
+    with _lock:
+        executor, _executor = _executor, None
+        readers = list(_readers.values())
+        _readers.clear()
+    if executor is not None:
+        executor.shutdown(wait=True)
+    for reader in readers:
+        reader.close()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(MAX_CONCURRENCY, thread_name_prefix='ferc-async')
+        return _executor
+
+
+def _get_reader(db_file):
+    key = str(Path(db_file).resolve())
+    with _lock:
+        if key not in _readers:
+            _readers[key] = FercReader(db_file)
+        return _readers[key]
+
+
+# Run a blocking getter on the pool
+async def _run(getter, db_file, subject_id, latest, compact):
+    reader = _get_reader(db_file)
+    # The token of this call: the connection while its query runs, checked under
+    # the lock on both sides so a cancel never interrupts another call's query
+    call = {'lock': threading.Lock(), 'conn': None, 'cancelled': False}
+
+    def call_getter():
+        with call['lock']:
+            if call['cancelled']:
+                return None
+            call['conn'] = reader.connection
+        try:
+            return getter(call['conn'], subject_id, latest, compact=compact)
+        finally:
+            with call['lock']:
+                call['conn'] = None
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_executor(), call_getter)
+    except asyncio.CancelledError:
+        # A call that has not started is dropped by the pool or skips the getter;
+        # one that has is interrupted before its thread can move on to another
+        with call['lock']:
+            call['cancelled'] = True
+            if call['conn'] is not None:
+                call['conn'].interrupt()
+        raise
+
+
+# Form 6
+async def aget_ferc6_income_statement(db_file, subject_id, latest=False, compact=False):
+    '''Async counterpart of ferc6_extracts.get_ferc6_income_statement.'''
+    return await _run(
+        ferc6_extracts.get_ferc6_income_statement, db_file, subject_id, latest, compact
+    )
+
+
+async def aget_ferc6_balance_sheet(db_file, subject_id, latest=False, compact=False):
+    '''Async counterpart of ferc6_extracts.get_ferc6_balance_sheet.'''
+    return await _run(
+        ferc6_extracts.get_ferc6_balance_sheet, db_file, subject_id, latest, compact
+    )
+
+
+async def aget_ferc6_cash_flow_statement(db_file, subject_id, latest=False, compact=False):
+    '''Async counterpart of ferc6_extracts.get_ferc6_cash_flow_statement.'''
+    return await _run(
+        ferc6_extracts.get_ferc6_cash_flow_statement, db_file, subject_id, latest, compact
+    )
+
+
+async def aget_ferc6_financial_package(db_file, subject_id, latest=False, compact=False):
+    '''Async counterpart of ferc6_extracts.get_ferc6_financial_package.'''
+    return await _run(
+        ferc6_extracts.get_ferc6_financial_package, db_file, subject_id, latest, compact
+    )
+
+
+# Form 2
+async def aget_ferc2_statement_of_income(db_file, subject_id, latest=False, compact=False):
+    '''Async counterpart of ferc2_extracts.get_ferc2_statement_of_income.'''
+    return await _run(
+        ferc2_extracts.get_ferc2_statement_of_income, db_file, subject_id, latest, compact
+    )
+
+
+async def aget_ferc2_balance_sheet_assets(db_file, subject_id, latest=False, compact=False):
+    '''Async counterpart of ferc2_extracts.get_ferc2_balance_sheet_assets.'''
+    return await _run(
+        ferc2_extracts.get_ferc2_balance_sheet_assets, db_file, subject_id, latest, compact
+    )
+
+
+async def aget_ferc2_balance_sheet_liabilities_and_equity(
+    db_file, subject_id, latest=False, compact=False
+):
+    '''Async counterpart of ferc2_extracts.get_ferc2_balance_sheet_liabilities_and_equity.'''
+    return await _run(
+        ferc2_extracts.get_ferc2_balance_sheet_liabilities_and_equity,
+        db_file, subject_id, latest, compact,
+    )
+
+
+async def aget_ferc2_statement_of_cash_flows(db_file, subject_id, latest=False, compact=False):
+    '''Async counterpart of ferc2_extracts.get_ferc2_statement_of_cash_flows.'''
+    return await _run(
+        ferc2_extracts.get_ferc2_statement_of_cash_flows, db_file, subject_id, latest, compact
+    )
+
+
+async def aget_ferc2_financial_package(db_file, subject_id, latest=False, compact=False):
+    '''Async counterpart of ferc2_extracts.get_ferc2_financial_package.'''
+    return await _run(
+        ferc2_extracts.get_ferc2_financial_package, db_file, subject_id, latest, compact
+    )
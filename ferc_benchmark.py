@@ -0,0 +1,225 @@
+'''
+This file contains a benchmark harness for the FERC Form 2 and Form 6 statement
+getters that runs without the real PUDL downloads.
+
+make_synthetic_database writes a ferc2_xbrl.sqlite or ferc6_xbrl.sqlite lookalike
+with the real table names and the statement columns of ferc_statements, for
+a configurable number of entities and years. run_benchmarks times every getter on
+single-entity, multi-entity and full-table workloads and reports latency
+percentiles, rows per second and the peak resident set size of the process.
+
+Run it from the command line with, e.g.:
+
+    python ferc_benchmark.py --entities 300 --years 7 --work-dir /tmp/ferc_bench
+'''
+
+import argparse
+import sqlite3
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ferc_forms import FORMS
+from ferc_sqlite import set_read_only_mode
+from ferc_statements import STATEMENT_SPECS
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+# Table and columns of every statement, by form
+SYNTHETIC_TABLES = {
+    form: {spec.table: spec.columns for spec in specs.values()}
+    for form, specs in STATEMENT_SPECS.items()
+}
+
+
+# Values of the utility_type_axis dimension in the synthetic Form 2 data, as PUDL spells them
+UTILITY_TYPES = ('total', 'ferc:GasUtilityMember', 'ferc:OtherUtilityMember')
+
+
+# Build the rows of one synthetic statement table
+def _synthetic_table(form, columns, n_entities, first_year, n_years, amendment_rate, rng):
+    columns = list(columns)
+    entities = np.arange(n_entities)
+    years = np.arange(first_year, first_year + n_years)
+    entity, year = (grid.ravel() for grid in np.meshgrid(entities, years, indexing='ij'))
+
+    # Some filings are resubmitted later in the year after the original
+    amended = rng.random(len(entity)) < amendment_rate
+    entity = np.concatenate([entity, entity[amended]])
+    year = np.concatenate([year, year[amended]])
+    month = np.concatenate([np.full(amended.size, 4), np.full(amended.sum(), 9)])
+
+    if 'utility_type_axis' in columns:
+        axis = np.repeat(np.array(UTILITY_TYPES), len(entity))
+        entity, year, month = (np.tile(values, len(UTILITY_TYPES)) for values in (entity, year, month))
+
+    # PUDL names each filing <Company_Name>_<form>_Q4_<publication epoch seconds>
+    n_rows = len(entity)
+    published = pd.to_datetime(pd.Series([f'{y + 1}-{m:02d}-15 12:00:00' for y, m in zip(year, month)]))
+    epoch_seconds = (published - pd.Timestamp('1970-01-01')) // pd.Timedelta(seconds=1)
+    form_label = 'form' + form[len('ferc'):]
+    df = pd.DataFrame({
+        'entity_id': [f'C{e:06d}' for e in entity],
+        'filing_name': [
+            f'Synthetic_Pipeline_Company_{e}_{form_label}_Q4_{seconds}'
+            for e, seconds in zip(entity, epoch_seconds)
+        ],
+        'publication_time': published.dt.strftime('%Y-%m-%d %H:%M:%S.%f'),
+    })
+    if 'date' in columns:
+        df['date'] = [f'{y}-12-31' for y in year]
+    else:
+        df['start_date'] = [f'{y}-01-01' for y in year]
+        df['end_date'] = [f'{y}-12-31' for y in year]
+    if 'utility_type_axis' in columns:
+        df['utility_type_axis'] = axis
+
+    line_items = [column for column in columns if column not in df.columns]
+    values = rng.integers(-10 ** 7, 10 ** 9, size=(n_rows, len(line_items))).astype(float)
+    values[rng.random(values.shape) < 0.3] = np.nan
+    df = pd.concat([df, pd.DataFrame(values, columns=line_items)], axis=1)
+
+    return df.loc[:, columns]
+
+
+# Write a synthetic PUDL-shaped database
+def make_synthetic_database(
+    db_file, form, n_entities=300, n_years=7, first_year=2019, amendment_rate=0.2, seed=0
+):
+    '''
+    Write a synthetic PUDL FERC sqlite database with the real table names and the
+    statement columns of ferc_statements. An existing file is replaced.
+
+    Parameters:
+        db_file (object): Path to write the database to
+        form (string): the form name, 'ferc2' or 'ferc6'
+        n_entities (int): the number of filers
+        n_years (int): the number of report years per filer
+        first_year (int): the first report year
+        amendment_rate (float): the share of filings that are resubmitted
+        seed (int): the random seed
+
+    Returns:
+        dict: the number of rows written per table
+    '''
+    rng = np.random.default_rng(seed)
+    Path(db_file).unlink(missing_ok=True)
+
+    row_counts = {}
+    conn = sqlite3.connect(db_file)
+    try:
+        for table, columns in SYNTHETIC_TABLES[form].items():
+            df = _synthetic_table(form, columns, n_entities, first_year, n_years, amendment_rate, rng)
+            df.to_sql(table, conn, index=False, chunksize=10000)
+            row_counts[table] = len(df)
+    finally:
+        conn.close()
+
+    return row_counts
+
+
+# Peak resident set size of this process in megabytes
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# Time one workload
+def _time_workload(call, repeat):
+    latencies = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = call()
+        latencies.append(time.perf_counter() - start)
+        rows += len(df)
+
+    latencies = np.array(latencies)
+    return {
+        'calls': repeat,
+        'p50_ms': np.percentile(latencies, 50) * 1000,
+        'p90_ms': np.percentile(latencies, 90) * 1000,
+        'p99_ms': np.percentile(latencies, 99) * 1000,
+        'max_ms': latencies.max() * 1000,
+        'rows_per_sec': rows / latencies.sum() if latencies.sum() else float('nan'),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+
+# Time every getter
+def run_benchmarks(db_files, repeat=20, multi_entity_count=50, full_table_repeat=3, seed=0):
+    '''
+    Time every statement getter on three workloads: one random entity per call,
+    multi_entity_count random entities per call, and the whole table.
+
+    Parameters:
+        db_files (dict): Path to the sqlite database file per form,
+            e.g. {'ferc2': 'ferc2_xbrl.sqlite', 'ferc6': 'ferc6_xbrl.sqlite'}
+        repeat (int): calls per single- and multi-entity workload
+        multi_entity_count (int): entities per multi-entity call
+        full_table_repeat (int): calls per full-table workload
+        seed (int): the random seed for picking entities
+
+    Returns:
+        DataFrame (object): one row per (form, statement, workload) with latency
+            percentiles, rows per second and peak RSS. Peak RSS is the process-wide
+            high-water mark when the workload finished
+    '''
+    rng = np.random.default_rng(seed)
+    results = []
+
+    for form, db_file in db_files.items():
+        for statement, getter in FORMS[form].items():
+            entity_ids = getter(db_file, None)['entity_id'].unique()
+            workloads = {
+                'single_entity': (lambda: getter(db_file, rng.choice(entity_ids)), repeat),
+                'multi_entity': (
+                    lambda: getter(db_file, list(rng.choice(entity_ids, multi_entity_count))),
+                    repeat,
+                ),
+                'full_table': (lambda: getter(db_file, None), full_table_repeat),
+            }
+            for workload, (call, workload_repeat) in workloads.items():
+                result = _time_workload(call, workload_repeat)
+                results.append({'form': form, 'statement': statement, 'workload': workload, **result})
+
+    return pd.DataFrame(results)
+
+
+# Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the FERC statement getters.')
+    parser.add_argument('--entities', type=int, default=300, help='filers per synthetic database')
+    parser.add_argument('--years', type=int, default=7, help='report years per filer')
+    parser.add_argument('--repeat', type=int, default=20, help='calls per workload')
+    parser.add_argument('--work-dir', default='benchmark_data', help='directory for the databases')
+    parser.add_argument('--forms', nargs='+', default=sorted(FORMS), choices=sorted(FORMS))
+    parser.add_argument(
+        '--read-only', action='store_true', help='use the immutable, memory-mapped read-only mode'
+    )
+    args = parser.parse_args(argv)
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    db_files = {}
+    for form in args.forms:
+        db_files[form] = work_dir / f'{form}_xbrl_synthetic.sqlite'
+        make_synthetic_database(db_files[form], form, args.entities, args.years)
+
+    if args.read_only:
+        set_read_only_mode()
+    results = run_benchmarks(db_files, repeat=args.repeat)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(results.round(2).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
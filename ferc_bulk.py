@@ -0,0 +1,152 @@
+'''
+This file contains functions to extract every statement for every entity of the
+FERC Form 2 and Form 6 databases in parallel.
+
+Work is split into (form, statement, entity chunk) units that run on a
+ProcessPoolExecutor. Each worker process opens its own read-only connection to
+each database once, and finished chunks are handed to a writer in the parent as
+they complete instead of being gathered into one large frame. With pivot_axes,
+statements with a dimension column such as utility_type_axis are pivoted inside
+the workers to one row per filing and period, with a fixed set of columns for
+every chunk.
+'''
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from ferc_forms import FORM_TABLES, FORMS, get_statement_getter
+from ferc_sqlite import connect_read_only, list_entity_ids, pivot_axis, read_only_options
+from ferc_statements import get_statement_spec
+
+
+# Read-only connections of a worker process, by form
+_worker_connections = {}
+
+
+# Open a worker's connections once, when the process starts
+def _init_worker(db_files, options):
+    for form, db_file in db_files.items():
+        _worker_connections[form] = connect_read_only(db_file, **(options or {}))
+
+
+# Extract one statement for one chunk of entities inside a worker
+def _extract_unit(form, statement, entity_ids, pivot=None):
+    getter = get_statement_getter(form, statement)
+    df = getter(_worker_connections[form], entity_ids)
+    if pivot is not None:
+        axis, axis_values = pivot
+        df = pivot_axis(df, axis, axis_values, flatten=True)
+    return form, statement, df
+
+
+# The dimension column of a statement and its values across the whole table
+def _statement_pivot(conn, form, statement):
+    spec = get_statement_spec(form, statement)
+    axes = [column for column in dict.fromkeys(spec.columns) if column.endswith('_axis')]
+    if len(axes) != 1:
+        return None
+
+    # Every chunk gets the columns of every value, so the chunks of a file line up
+    rows = conn.execute(
+        f'SELECT DISTINCT "{axes[0]}" FROM {spec.table} '
+        f'WHERE "{axes[0]}" IS NOT NULL ORDER BY 1'
+    )
+    return axes[0], tuple(row[0] for row in rows)
+
+
+# Split the entities of each form into work units
+def _work_units(db_files, statements, chunk_size, pivot_axes=False):
+    for form, db_file in db_files.items():
+        form_statements = list(statements.get(form, FORMS[form]) if statements else FORMS[form])
+        conn = connect_read_only(db_file)
+        try:
+            entity_ids = list_entity_ids(conn, FORM_TABLES[form])
+            pivots = {
+                statement: _statement_pivot(conn, form, statement) if pivot_axes else None
+                for statement in form_statements
+            }
+        finally:
+            conn.close()
+
+        for statement in form_statements:
+            for start in range(0, len(entity_ids), chunk_size):
+                yield form, statement, entity_ids[start:start + chunk_size], pivots[statement]
+
+
+# Hand finished chunks to the writer
+def _write_results(futures, writer, row_counts):
+    for future in futures:
+        form, statement, df = future.result()
+        if df.empty:
+            continue
+        writer(form, statement, df)
+        row_counts[form, statement] = row_counts.get((form, statement), 0) + len(df)
+
+
+# Extract everything on a process pool
+def extract_all(
+    db_files, writer, statements=None, chunk_size=50, max_workers=None, pivot_axes=False
+):
+    '''
+    Extract statements for every entity in parallel and stream them to a writer.
+    While ferc_sqlite.set_read_only_mode is on, the workers open the databases
+    immutable and memory mapped, sharing the file through the OS page cache.
+
+    Parameters:
+        db_files (dict): Path to the PUDL sqlite database file per form,
+            e.g. {'ferc2': 'ferc2_xbrl.sqlite', 'ferc6': 'ferc6_xbrl.sqlite'}
+        writer (function): called in the parent process as
+            writer(form, statement, df) for every finished chunk
+        statements (dict): the statement names to extract per form. Forms left
+            out, or None, extract every statement
+        chunk_size (int): the number of entities per work unit
+        max_workers (int): the number of worker processes. Defaults to the CPU count
+        pivot_axes (bool): pivot the dimension column of statements such as the
+            Form 2 Statement of Income into <axis value>__<line item> columns,
+            with ferc_sqlite.pivot_axis
+
+    Returns:
+        dict: the number of rows written per (form, statement)
+    '''
+    max_workers = max_workers or os.cpu_count() or 1
+    units = _work_units(db_files, statements, chunk_size, pivot_axes)
+    row_counts = {}
+
+    with ProcessPoolExecutor(
+        max_workers, initializer=_init_worker, initargs=(dict(db_files), read_only_options())
+    ) as executor:
+        # Keep a bounded number of chunks in flight so results never pile up
+        pending = set()
+        for unit in units:
+            pending.add(executor.submit(_extract_unit, *unit))
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _write_results(done, writer, row_counts)
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            _write_results(done, writer, row_counts)
+
+    return row_counts
+
+
+class CsvDirectoryWriter:
+    '''
+    A writer for extract_all that appends each chunk to <out_dir>/<form>_<statement>.csv,
+    writing the header with the first chunk of each file.
+
+    Parameters:
+        out_dir (object): Path to the directory to write the CSV files to
+    '''
+
+    def __init__(self, out_dir):
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self._started = set()
+
+    def __call__(self, form, statement, df):
+        path = self.out_dir / f'{form}_{statement}.csv'
+        first_chunk = path not in self._started
+        df.to_csv(path, mode='w' if first_chunk else 'a', header=first_chunk, index=False)
+        self._started.add(path)
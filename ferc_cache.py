@@ -0,0 +1,226 @@
+'''
+This file contains an opt-in cache for the FERC Form 2 and Form 6 statement getters.
+
+Caching is off until enable_cache is called. Results are then kept in an in-memory
+LRU bounded by DataFrame size, optionally backed by a pickle directory on disk
+that is bounded too, evicting the least recently used files.
+Cache keys include the database file's resolved path, size and modification time,
+so a new PUDL release invalidates every entry built from the old file. Calls that
+pass an open sqlite3 connection instead of a path are never cached.
+'''
+
+import functools
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from ferc_metrics import annotate
+from ferc_sqlite import as_entity_ids
+
+
+# Identify a database file by path, size and modification time
+def database_fingerprint(db_file):
+    '''
+    Return a key that changes whenever the database file is replaced or modified.
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file
+
+    Returns:
+        tuple: the resolved path, size in bytes and modification time in nanoseconds
+    '''
+    path = Path(db_file).resolve()
+    stat = path.stat()
+    return (str(path), stat.st_size, stat.st_mtime_ns)
+
+
+class StatementCache:
+    '''
+    An LRU cache of statement DataFrames evicted by total memory size, with an
+    optional on-disk tier. Cached frames are copied on the way in and out so
+    callers can modify what they get back.
+
+    The on-disk tier evicts the files least recently written or read once it
+    grows past max_disk_bytes. Entries of a replaced database file are never
+    read again, so they are the first to go.
+
+    Parameters:
+        max_bytes (int): the memory budget for cached DataFrames
+        disk_dir (object): Path to a directory for the on-disk tier, or None for
+            memory only
+        max_disk_bytes (int): the size budget of the on-disk tier
+    '''
+
+    def __init__(self, max_bytes=256 * 1024 ** 2, disk_dir=None, max_disk_bytes=1024 ** 3):
+        self.max_bytes = max_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _disk_path(self, key):
+        return self.disk_dir / (hashlib.sha256(repr(key).encode()).hexdigest() + '.pkl')
+
+    def get(self, key):
+        '''Return a copy of the cached DataFrame for key, or None on a miss.'''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0].copy()
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                with open(path, 'rb') as file:
+                    df = pickle.load(file)
+                # Mark the file as recently used for the disk eviction
+                os.utime(path)
+            except FileNotFoundError:
+                df = None
+            if df is not None:
+                self._remember(key, df)
+                with self._lock:
+                    self.hits += 1
+                return df.copy()
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, df):
+        '''Cache a copy of df under key.'''
+        df = df.copy()
+        self._remember(key, df)
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            temp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with open(temp_path, 'wb') as file:
+                pickle.dump(df, file, protocol=pickle.HIGHEST_PROTOCOL)
+            if temp_path.stat().st_size > self.max_disk_bytes:
+                temp_path.unlink()
+                return
+            os.replace(temp_path, path)
+            self._evict_disk()
+
+    def _evict_disk(self):
+        '''Delete the least recently used files until the on-disk tier fits its budget.'''
+        files = []
+        for path in self.disk_dir.glob('*.pkl'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Removed by another process sharing the directory
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+
+        total_bytes = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_bytes <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+
+    def _remember(self, key, df):
+        size = int(df.memory_usage(deep=True).sum())
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+
+    def clear(self):
+        '''Drop every cached entry, including the on-disk tier.'''
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob('*.pkl'):
+                path.unlink()
+
+
+# The active cache, or None while caching is disabled
+_cache = None
+
+
+# Turn caching on for every getter
+def enable_cache(max_bytes=256 * 1024 ** 2, disk_dir=None, max_disk_bytes=1024 ** 3):
+    '''
+    Start caching getter results. Replaces any cache that was already enabled.
+
+    Parameters:
+        max_bytes (int): the memory budget for cached DataFrames
+        disk_dir (object): Path to a directory for the on-disk tier, or None for
+            memory only
+        max_disk_bytes (int): the size budget of the on-disk tier
+
+    Returns:
+        StatementCache (object): the new cache
+    '''
+    global _cache
+    _cache = StatementCache(max_bytes, disk_dir, max_disk_bytes)
+    return _cache
+
+
+# Turn caching off
+def disable_cache():
+    '''Stop caching getter results and drop the in-memory cache.'''
+    global _cache
+    _cache = None
+
+
+# Return the active cache
+def get_cache():
+    '''Return the active StatementCache, or None while caching is disabled.'''
+    return _cache
+
+
+# Decorator for the statement getters
+def cached_statement(getter):
+    '''
+    Serve getter(db_file, subject_id, *args, **options) from the active cache
+    when caching is enabled and db_file is a path.
+    '''
+    @functools.wraps(getter)
+    def wrapper(db_file, subject_id, *args, **options):
+        cache = _cache
+        if cache is None or not isinstance(db_file, (str, os.PathLike)):
+            return getter(db_file, subject_id, *args, **options)
+
+        # Normalize once, since a one-shot iterator is used up by building the key
+        if subject_id is not None:
+            subject_id = as_entity_ids(subject_id)
+        key = (
+            getter.__module__,
+            getter.__name__,
+            database_fingerprint(db_file),
+            subject_id,
+            args,
+            tuple(sorted(options.items())),
+        )
+        df = cache.get(key)
+        if df is not None:
+            annotate(cache='hit')
+            return df
+
+        annotate(cache='miss')
+        df = getter(db_file, subject_id, *args, **options)
+        cache.put(key, df)
+        return df
+
+    return wrapper
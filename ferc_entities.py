@@ -0,0 +1,175 @@
+'''
+This file contains an entity directory for PUDL ferc2_xbrl.sqlite and
+ferc6_xbrl.sqlite databases, to look up entity_ids by company name.
+
+The directory holds one (entity_id, filing_name) pair per entity, with the
+entity's latest filing_name across every table the extract modules read, and an
+in-memory token index over the company names. PUDL filing names carry a
+per-filing suffix such as _form6_Q4_1650134001, which is left out of the index.
+Lookups are index hits with prefix matching, and optionally fuzzy matching of
+misspelled words, instead of a pandas scan of a whole statement table.
+'''
+
+import bisect
+import difflib
+import functools
+import re
+
+from ferc_cache import database_fingerprint
+from ferc_sqlite import connect
+from ferc_statements import STATEMENT_SPECS, form_tables
+
+
+# The per-filing part of a PUDL filing_name, e.g. '_form6_Q4_1650134001'
+FILING_SUFFIX = re.compile(r'_form\d+_q\d_\d+$', re.IGNORECASE)
+
+
+# Split names and queries into lowercase words
+def _tokenize(text):
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+# The company part of a filing name
+def company_name(filing_name):
+    '''
+    Strip the per-filing suffix off a PUDL filing_name.
+
+    Parameters:
+        filing_name (string): e.g. 'Yellowstone_Pipe_Line_Company_form6_Q4_1650134001'
+
+    Returns:
+        string: the company part, e.g. 'Yellowstone_Pipe_Line_Company'
+    '''
+    return FILING_SUFFIX.sub('', filing_name)
+
+
+class EntityDirectory:
+    '''
+    A searchable list of entities, one (entity_id, filing_name) pair per entity_id.
+
+    Parameters:
+        entities (iterable): (entity_id, filing_name) pairs. Of several pairs
+            with the same entity_id, the last one is kept
+    '''
+
+    def __init__(self, entities):
+        latest_names = {
+            entity_id: filing_name for entity_id, filing_name in entities if entity_id is not None
+        }
+        self.entities = sorted(latest_names.items())
+        self._postings = {}
+        for position, (entity_id, filing_name) in enumerate(self.entities):
+            tokens = _tokenize(company_name(filing_name or ''))
+            for token in set(tokens) | {entity_id.lower()}:
+                self._postings.setdefault(token, set()).add(position)
+        self._tokens = sorted(self._postings)
+
+    @classmethod
+    def from_database(cls, db_file):
+        '''
+        Build the directory from every ferc2/ferc6 statement table in a database,
+        with the filing_name of each entity's latest publication_time.
+
+        Parameters:
+            db_file (object): Path to a PUDL FERC sqlite database file
+
+        Returns:
+            EntityDirectory (object): the directory of that database
+        '''
+        conn = connect(db_file)
+        try:
+            existing_tables = {
+                row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            tables = [
+                table for table in dict.fromkeys(
+                    table for form in STATEMENT_SPECS for table in form_tables(form)
+                )
+                if table in existing_tables
+            ]
+            union = ' UNION '.join(
+                f'SELECT entity_id, filing_name, publication_time FROM {table}' for table in tables
+            )
+            # In publication order, so the latest filing_name of an entity comes last
+            entities = conn.execute(
+                f'SELECT entity_id, filing_name FROM ({union}) ORDER BY publication_time, filing_name'
+            ).fetchall() if tables else []
+        finally:
+            conn.close()
+
+        return cls(entities)
+
+    def _match_token(self, token, fuzzy):
+        '''Return {position: score} for one query word: 3 exact, 2 prefix, 1 fuzzy.'''
+        scores = {}
+        start = bisect.bisect_left(self._tokens, token)
+        for candidate in self._tokens[start:]:
+            if not candidate.startswith(token):
+                break
+            score = 3 if candidate == token else 2
+            for position in self._postings[candidate]:
+                scores[position] = max(scores.get(position, 0), score)
+
+        if not scores and fuzzy:
+            for candidate in difflib.get_close_matches(token, self._tokens, n=5, cutoff=0.75):
+                for position in self._postings[candidate]:
+                    scores.setdefault(position, 1)
+
+        return scores
+
+    def find_entities(self, query, limit=20, fuzzy=True):
+        '''
+        Find entities whose company name (or entity_id) matches every word of
+        the query, as a whole word or a word prefix. With fuzzy=True, a query word
+        that matches nothing falls back to close spellings.
+
+        Parameters:
+            query (string): the words to look for, e.g. 'yellowstone pipe'
+            limit (int): the maximum number of matches to return
+            fuzzy (bool): allow misspelled query words
+
+        Returns:
+            list: (entity_id, filing_name) pairs, one per entity, best matches first
+        '''
+        scores = None
+        for token in _tokenize(query):
+            token_scores = self._match_token(token, fuzzy)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    position: score + token_scores[position]
+                    for position, score in scores.items() if position in token_scores
+                }
+            if not scores:
+                return []
+
+        if scores is None:
+            return []
+
+        ranked = sorted(scores, key=lambda position: (-scores[position], position))
+        return [self.entities[position] for position in ranked[:limit]]
+
+
+# Build each database's directory once
+@functools.lru_cache(maxsize=8)
+def _directory_for(fingerprint):
+    return EntityDirectory.from_database(fingerprint[0])
+
+
+# Look up entities by name
+def find_entities(db_file, query, limit=20, fuzzy=True):
+    '''
+    Find entities by company name in a PUDL FERC sqlite database. The directory is
+    built on first use and rebuilt only when the database file changes.
+
+    Parameters:
+        db_file (object): Path to a PUDL FERC sqlite database file
+        query (string): the words to look for, e.g. 'yellowstone'
+        limit (int): the maximum number of matches to return
+        fuzzy (bool): allow misspelled query words
+
+    Returns:
+        list: (entity_id, latest filing_name) pairs, one per entity, best matches first
+    '''
+    return _directory_for(database_fingerprint(db_file)).find_entities(query, limit, fuzzy)
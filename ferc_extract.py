@@ -0,0 +1,255 @@
+'''
+This file contains a command-line exporter for FERC Form 2 and Form 6 statements,
+for cron jobs and shell pipelines.
+
+    python ferc_extract.py statements [form]
+    python ferc_extract.py entities form6 --db ferc6_xbrl.sqlite
+    python ferc_extract.py form6 income-statement --entities C001041 --out income.csv
+
+Statements are streamed in chunks to CSV, JSON Lines or Parquet, so whole tables
+export at constant memory. pandas (and pyarrow for Parquet) are imported only by
+the export command; the statements and entities commands use just the standard
+library and the statement registry, so they start in a few tens of milliseconds.
+'''
+
+import argparse
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+from ferc_statements import STATEMENT_SPECS, form_tables
+
+
+OUTPUT_FORMATS = ('csv', 'jsonl', 'parquet')
+
+
+# Accept 'form6' as well as 'ferc6', and 'income-statement' for 'income_statement'
+def _form_name(value):
+    form = 'ferc' + value[len('form'):] if value.startswith('form') else value
+    if form not in STATEMENT_SPECS:
+        raise argparse.ArgumentTypeError(
+            f'unknown form {value!r}, expected one of {sorted(STATEMENT_SPECS)}'
+        )
+    return form
+
+
+def _statement_name(value):
+    return value.replace('-', '_')
+
+
+# Open a database without write access
+def _connect(db_file):
+    if not Path(db_file).is_file():
+        sys.exit(f'ferc_extract: no database file at {db_file}')
+    uri = Path(db_file).resolve().as_uri() + '?mode=ro'
+    return sqlite3.connect(uri, uri=True)
+
+
+# statements command
+def list_statements(form=None, out=None):
+    '''
+    Write one line per registered statement: form, statement, period type and table.
+
+    Parameters:
+        form (string): only list this form's statements, or None for every form
+        out (object): the text stream to write to, by default standard output
+    '''
+    out = out or sys.stdout
+    for spec_form, specs in STATEMENT_SPECS.items():
+        if form is not None and spec_form != form:
+            continue
+        for spec in specs.values():
+            out.write(f'{spec.form}\t{spec.name}\t{spec.period_type}\t{spec.table}\n')
+
+
+# entities command
+def list_entities(db_file, form, out=None):
+    '''
+    Write one line per entity_id found in a form's statement tables, with the
+    filing_name of its latest filing. PUDL filing names are per filing, so the
+    same choice as ferc_entities.EntityDirectory is made.
+
+    Parameters:
+        db_file (object): Path to the PUDL FERC sqlite database file
+        form (string): the form name, 'ferc2' or 'ferc6'
+        out (object): the text stream to write to, by default standard output
+    '''
+    out = out or sys.stdout
+    conn = _connect(db_file)
+    try:
+        existing_tables = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        tables = [table for table in form_tables(form) if table in existing_tables]
+        if not tables:
+            return
+        union = ' UNION '.join(
+            f'SELECT entity_id, filing_name, publication_time FROM {table}' for table in tables
+        )
+        latest_names = (
+            'SELECT entity_id, filing_name FROM ('
+            'SELECT entity_id, filing_name, ROW_NUMBER() OVER ('
+            'PARTITION BY entity_id ORDER BY publication_time DESC, filing_name DESC'
+            f') AS filing_rank FROM ({union}) WHERE entity_id IS NOT NULL'
+            ') WHERE filing_rank = 1 ORDER BY entity_id'
+        )
+        for entity_id, filing_name in conn.execute(latest_names):
+            out.write(f'{entity_id}\t{filing_name}\n')
+    finally:
+        conn.close()
+
+
+# Stream chunks as CSV
+def _write_csv(chunks, columns, out):
+    import pandas as pd
+
+    header = True
+    for df in chunks:
+        df.to_csv(out, header=header, index=False)
+        header = False
+    if header:
+        pd.DataFrame(columns=list(columns)).to_csv(out, index=False)
+
+
+# Stream chunks as JSON Lines
+def _write_jsonl(chunks, columns, out):
+    for df in chunks:
+        if not df.empty:
+            out.write(df.to_json(orient='records', lines=True).rstrip('\n') + '\n')
+
+
+# Stream chunks as Parquet row groups
+def _write_parquet(chunks, spec, out_path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from ferc_parquet import statement_schema
+
+    # A fixed schema, since a chunk where a line item is all NULL has no type of its own
+    schema = statement_schema(spec)
+    with pq.ParquetWriter(out_path, schema) as writer:
+        for df in chunks:
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+
+
+# export command
+def export_statement(
+    db_file, form, statement, out=None, output_format='csv', subject_id=None,
+    latest=False, chunksize=10000,
+):
+    '''
+    Stream one statement out of a PUDL FERC sqlite file to CSV, JSON Lines or Parquet.
+
+    Parameters:
+        db_file (object): Path to the PUDL FERC sqlite database file
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statement (string): the statement name, e.g. 'income_statement'
+        out (object): Path to write to, or None for standard output.
+            Parquet needs a path
+        output_format (string): 'csv', 'jsonl' or 'parquet'
+        subject_id (iterable): the entity_ids to export, or None for every entity
+        latest (bool): export only the latest filing for each reporting period
+        chunksize (int): the number of rows held in memory at a time
+    '''
+    from ferc_forms import get_statement_iterator
+    from ferc_statements import get_statement_spec
+
+    spec = get_statement_spec(form, statement)
+    conn = _connect(db_file)
+    try:
+        chunks = get_statement_iterator(form, statement)(
+            conn, subject_id, chunksize=chunksize, latest=latest
+        )
+        if output_format == 'parquet':
+            _write_parquet(chunks, spec, out)
+            return
+
+        write = _write_csv if output_format == 'csv' else _write_jsonl
+        if out is None:
+            write(chunks, spec.columns, sys.stdout)
+        else:
+            with open(out, 'w', newline='') as file:
+                write(chunks, spec.columns, file)
+    finally:
+        conn.close()
+
+
+# Read entity_ids from the command line and an optional file
+def _subject_ids(args):
+    if args.entities is None and args.entities_file is None:
+        return None
+
+    entity_ids = list(args.entities or [])
+    if args.entities_file is not None:
+        with open(args.entities_file) as file:
+            entity_ids.extend(line.strip() for line in file if line.strip())
+    return entity_ids
+
+
+# Command line entry point
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    if argv and argv[0] == 'statements':
+        parser = argparse.ArgumentParser(
+            prog='ferc_extract.py statements', description='List the registered statements.'
+        )
+        parser.add_argument('form', nargs='?', type=_form_name, help="e.g. 'form6' or 'ferc6'")
+        args = parser.parse_args(argv[1:])
+        list_statements(args.form)
+        return
+
+    if argv and argv[0] == 'entities':
+        parser = argparse.ArgumentParser(
+            prog='ferc_extract.py entities', description='List the entities in a database.'
+        )
+        parser.add_argument('form', type=_form_name, help="e.g. 'form6' or 'ferc6'")
+        parser.add_argument('--db', help='the database file, by default <form>_xbrl.sqlite')
+        args = parser.parse_args(argv[1:])
+        list_entities(args.db or f'{args.form}_xbrl.sqlite', args.form)
+        return
+
+    parser = argparse.ArgumentParser(
+        prog='ferc_extract.py',
+        description='Export a FERC statement. See also the statements and entities commands.',
+    )
+    parser.add_argument('form', type=_form_name, help="e.g. 'form6' or 'ferc6'")
+    parser.add_argument('statement', type=_statement_name, help="e.g. 'income-statement'")
+    parser.add_argument('--db', help='the database file, by default <form>_xbrl.sqlite')
+    parser.add_argument('--entities', nargs='+', metavar='ENTITY_ID', help='entity_ids to export')
+    parser.add_argument('--entities-file', help='a file with one entity_id per line')
+    parser.add_argument('--out', help='the output file, by default standard output')
+    parser.add_argument(
+        '--format', choices=OUTPUT_FORMATS, help='the output format, by default from --out or csv'
+    )
+    parser.add_argument('--latest', action='store_true', help='only the latest filing per period')
+    parser.add_argument('--chunksize', type=int, default=10000, help='rows held in memory at a time')
+    args = parser.parse_args(argv)
+
+    if args.statement not in STATEMENT_SPECS[args.form]:
+        parser.error(
+            f'unknown {args.form} statement {args.statement!r}, '
+            f'expected one of {sorted(STATEMENT_SPECS[args.form])}'
+        )
+    output_format = args.format
+    if output_format is None:
+        suffix = Path(args.out).suffix.lstrip('.') if args.out else ''
+        output_format = suffix if suffix in OUTPUT_FORMATS else 'csv'
+    if output_format == 'parquet' and args.out is None:
+        parser.error('--out is required for parquet output')
+
+    export_statement(
+        args.db or f'{args.form}_xbrl.sqlite', args.form, args.statement,
+        out=args.out, output_format=output_format, subject_id=_subject_ids(args),
+        latest=args.latest, chunksize=args.chunksize,
+    )
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except BrokenPipeError:
+        # The reader of a pipe such as `| head` went away; exit without a traceback
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
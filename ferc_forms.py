@@ -0,0 +1,174 @@
+'''
+This file maps the FERC form names used across the repository ('ferc2', 'ferc6')
+to the statement getters of their extract modules.
+
+Every statement registered in ferc_statements is included, also statements
+registered after this module is imported. Statements without a hand-written
+getter in an extract module get one built from their StatementSpec on first use.
+'''
+
+import functools
+from collections.abc import Mapping
+
+import ferc2_extracts
+import ferc6_extracts
+from ferc_cache import cached_statement
+from ferc_metrics import instrumented
+from ferc_sqlite import extract_statement, iter_statement
+from ferc_statements import STATEMENT_SPECS, form_tables
+
+
+# Hand-written getters and iterators by form name
+_GETTERS = {
+    'ferc2': ferc2_extracts.STATEMENTS,
+    'ferc6': ferc6_extracts.STATEMENTS,
+}
+_ITERATORS = {
+    'ferc2': ferc2_extracts.STATEMENT_ITERATORS,
+    'ferc6': ferc6_extracts.STATEMENT_ITERATORS,
+}
+
+
+# Build a getter for a registered statement
+def make_statement_getter(spec):
+    '''
+    Return a getter for a StatementSpec, with the same signature, result cache
+    and metrics as the hand-written getters.
+
+    Parameters:
+        spec (object): the StatementSpec to extract
+
+    Returns:
+        function: the getter, called as getter(db_file, subject_id, latest, compact)
+    '''
+    def getter(db_file, subject_id, latest=False, compact=False):
+        return extract_statement(db_file, spec, subject_id, latest, compact)
+
+    # The cache keys on the getter's module and name
+    getter.__name__ = getter.__qualname__ = f'get_{spec.form}_{spec.name}'
+    getter.__doc__ = f'Extract the {spec.name} statement out of a PUDL FERC sqlite file.'
+    return instrumented(cached_statement(getter))
+
+
+# Build a chunked iterator for a registered statement
+def make_statement_iterator(spec):
+    '''
+    Return a chunked iterator for a StatementSpec, with the same signature as
+    the hand-written iterators.
+
+    Parameters:
+        spec (object): the StatementSpec to extract
+
+    Returns:
+        function: the iterator, called as iterator(db_file, subject_id, chunksize)
+    '''
+    def iterator(db_file, subject_id=None, chunksize=10000, latest=False, compact=False):
+        yield from iter_statement(db_file, spec, subject_id, chunksize, latest, compact)
+
+    iterator.__name__ = iterator.__qualname__ = f'iter_{spec.form}_{spec.name}'
+    iterator.__doc__ = f'Stream the {spec.name} statement out of a PUDL FERC sqlite file.'
+    return iterator
+
+
+# The getter of a statement: hand-written if there is one, otherwise built once
+@functools.lru_cache(maxsize=None)
+def _statement_getter(spec):
+    return _GETTERS.get(spec.form, {}).get(spec.name) or make_statement_getter(spec)
+
+
+@functools.lru_cache(maxsize=None)
+def _statement_iterator(spec):
+    return _ITERATORS.get(spec.form, {}).get(spec.name) or make_statement_iterator(spec)
+
+
+class _FormView(Mapping):
+    '''
+    A read-only mapping of form name to a value built from that form's
+    registered statements. It reads STATEMENT_SPECS on every lookup, so
+    statements registered after this module was imported are included.
+
+    Parameters:
+        build (function): called as build(form) to build the value of a form
+    '''
+
+    def __init__(self, build):
+        self._build = build
+
+    def __getitem__(self, form):
+        if form not in STATEMENT_SPECS:
+            raise KeyError(form)
+        return self._build(form)
+
+    def __iter__(self):
+        return iter(list(STATEMENT_SPECS))
+
+    def __len__(self):
+        return len(STATEMENT_SPECS)
+
+
+# Statement getters by form name
+FORMS = _FormView(lambda form: {
+    name: _statement_getter(spec) for name, spec in STATEMENT_SPECS[form].items()
+})
+
+
+# Chunked statement iterators by form name
+FORM_ITERATORS = _FormView(lambda form: {
+    name: _statement_iterator(spec) for name, spec in STATEMENT_SPECS[form].items()
+})
+
+
+# Table of each statement, by form name
+FORM_STATEMENT_TABLES = _FormView(lambda form: {
+    name: spec.table for name, spec in STATEMENT_SPECS[form].items()
+})
+
+
+# Tables read by each form's getters
+FORM_TABLES = _FormView(form_tables)
+
+
+# Look up the getter for one statement of one form
+def get_statement_getter(form, statement):
+    '''
+    Return the getter function for a statement of a FERC form.
+
+    Parameters:
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statement (string): the statement name, e.g. 'income_statement'
+
+    Returns:
+        function: the getter, called as getter(db_file, subject_id)
+
+    Raises:
+        KeyError: if the form or statement is unknown
+    '''
+    if form not in STATEMENT_SPECS:
+        raise KeyError(f'Unknown form {form!r}, expected one of {sorted(STATEMENT_SPECS)}')
+    if statement not in STATEMENT_SPECS[form]:
+        raise KeyError(
+            f'Unknown {form} statement {statement!r}, expected one of {sorted(STATEMENT_SPECS[form])}'
+        )
+
+    return _statement_getter(STATEMENT_SPECS[form][statement])
+
+
+# Look up the chunked iterator for one statement of one form
+def get_statement_iterator(form, statement):
+    '''
+    Return the chunked iterator function for a statement of a FERC form.
+
+    Parameters:
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statement (string): the statement name, e.g. 'income_statement'
+
+    Returns:
+        function: the iterator, called as iterator(db_file, subject_id, chunksize)
+
+    Raises:
+        KeyError: if the form or statement is unknown
+    '''
+    # Reuse the getter lookup for its error messages
+    get_statement_getter(form, statement)
+
+    return _statement_iterator(STATEMENT_SPECS[form][statement])
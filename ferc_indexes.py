@@ -0,0 +1,85 @@
+'''
+This file contains functions to add lookup indexes to PUDL ferc2_xbrl.sqlite and
+ferc6_xbrl.sqlite databases.
+
+The PUDL downloads ship without indexes on entity_id, so every getter call scans
+its whole table. SQLite can only index a table from within the database file that
+holds it, so the indexes are built on a writable copy and the original download is
+left unmodified. Point the getters at the copy afterwards.
+'''
+
+import sqlite3
+from pathlib import Path
+
+from ferc_statements import STATEMENT_SPECS, form_tables
+
+
+# Columns to index in every table that has them
+INDEXED_COLUMNS = ('entity_id', 'publication_time', 'date', 'end_date')
+
+
+# Index the tables the extract modules read from
+def create_indexes(db_file, tables=None):
+    '''
+    Create (or reuse) an index on each of INDEXED_COLUMNS in the given tables.
+    This writes to db_file, so use it on a copy; see build_indexed_copy.
+
+    Parameters:
+        db_file (object): Path to a writable PUDL FERC sqlite database file
+        tables (iterable): the tables to index. Defaults to every table of the
+            statements registered in ferc_statements that exists in the database
+
+    Returns:
+        list: the names of the indexes now present for those tables
+    '''
+    conn = sqlite3.connect(db_file)
+    try:
+        existing_tables = {
+            row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        if tables is None:
+            tables = [
+                table for form in STATEMENT_SPECS for table in form_tables(form)
+                if table in existing_tables
+            ]
+
+        index_names = []
+        with conn:
+            for table in dict.fromkeys(tables):
+                table_columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+                for column in INDEXED_COLUMNS:
+                    if column not in table_columns:
+                        continue
+                    index_name = f'{table}_{column}_idx'
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "{index_name}" ON "{table}" ("{column}")')
+                    index_names.append(index_name)
+            conn.execute('ANALYZE')
+    finally:
+        conn.close()
+
+    return index_names
+
+
+# Copy a PUDL download and index the copy
+def build_indexed_copy(db_file, out_file, tables=None):
+    '''
+    Copy a PUDL FERC sqlite database with SQLite's online backup API and create
+    the lookup indexes on the copy. db_file is opened read-only and never modified.
+
+    Parameters:
+        db_file (object): Path to the original PUDL FERC sqlite database file
+        out_file (object): Path to write the indexed copy to
+        tables (iterable): the tables to index; see create_indexes
+
+    Returns:
+        list: the names of the indexes now present in the copy
+    '''
+    source = sqlite3.connect(Path(db_file).resolve().as_uri() + '?mode=ro', uri=True)
+    target = sqlite3.connect(out_file)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+    return create_indexes(out_file, tables)
@@ -0,0 +1,172 @@
+'''
+This file contains optional timing and metrics instrumentation for the FERC Form 2
+and Form 6 statement getters.
+
+Register a callback with add_metrics_callback to receive one event per getter call:
+
+    {
+        'function': 'get_ferc6_income_statement',
+        'seconds': 0.0123,
+        'stages': {'connect': ..., 'prepare': ..., 'query': ..., 'frame': ...},
+        'rows': 12,
+        'bytes': 3456,
+        'cache': 'hit', 'miss' or None,
+        'error': None or the exception raised,
+    }
+
+The stages are connect (opening the database), prepare (checking the statement
+columns and building the SQL), query (running the SQL and fetching the rows),
+frame (building the DataFrame) and compact (converting dtypes). MetricsRegistry is
+a ready-made callback that aggregates the events. While no callback is registered
+the instrumentation is a single list check per call.
+'''
+
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+import pandas as pd
+
+
+_callbacks = []
+_current_event = contextvars.ContextVar('ferc_metrics_event', default=None)
+
+
+# Register and unregister callbacks
+def add_metrics_callback(callback):
+    '''
+    Call callback(event) after every instrumented getter call.
+
+    Parameters:
+        callback (function): receives one event dict per call
+    '''
+    _callbacks.append(callback)
+
+
+def remove_metrics_callback(callback):
+    '''Stop calling a callback registered with add_metrics_callback.'''
+    _callbacks.remove(callback)
+
+
+# Time one stage of the current getter call
+def stage(name):
+    '''
+    Return a context manager that adds its elapsed time to stage name of the
+    current getter call's event, or does nothing outside an instrumented call.
+    '''
+    event = _current_event.get()
+    if event is None:
+        return nullcontext()
+    return _timed_stage(event, name)
+
+
+@contextmanager
+def _timed_stage(event, name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = event['stages']
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - start
+
+
+# Attach a value to the current getter call's event
+def annotate(**values):
+    '''Set fields such as cache='hit' on the current getter call's event, if any.'''
+    event = _current_event.get()
+    if event is not None:
+        event.update(values)
+
+
+# Size of a getter result
+def _result_size(result):
+    frames = result if isinstance(result, tuple) else (result,)
+    frames = [frame for frame in frames if isinstance(frame, pd.DataFrame)]
+    rows = sum(len(frame) for frame in frames)
+    size = sum(int(frame.memory_usage(deep=True).sum()) for frame in frames)
+    return rows, size
+
+
+# Decorator for the getters
+def instrumented(getter):
+    '''Emit a metrics event for every call of getter while callbacks are registered.'''
+    @functools.wraps(getter)
+    def wrapper(*args, **kwargs):
+        if not _callbacks:
+            return getter(*args, **kwargs)
+
+        event = {
+            'function': getter.__name__,
+            'seconds': None,
+            'stages': {},
+            'rows': None,
+            'bytes': None,
+            'cache': None,
+            'error': None,
+        }
+        token = _current_event.set(event)
+        start = time.perf_counter()
+        try:
+            result = getter(*args, **kwargs)
+            event['rows'], event['bytes'] = _result_size(result)
+            return result
+        except Exception as error:
+            event['error'] = error
+            raise
+        finally:
+            event['seconds'] = time.perf_counter() - start
+            _current_event.reset(token)
+            for callback in list(_callbacks):
+                callback(event)
+
+    return wrapper
+
+
+class MetricsRegistry:
+    '''
+    A metrics callback that aggregates events per getter. Register it with
+    add_metrics_callback(registry) and read the totals with summary().
+    '''
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            totals = self._totals.setdefault(event['function'], {
+                'calls': 0, 'errors': 0, 'seconds': 0.0, 'rows': 0, 'bytes': 0,
+                'cache_hits': 0, 'cache_misses': 0, 'stages': {},
+            })
+            totals['calls'] += 1
+            totals['errors'] += event['error'] is not None
+            totals['seconds'] += event['seconds']
+            totals['rows'] += event['rows'] or 0
+            totals['bytes'] += event['bytes'] or 0
+            totals['cache_hits'] += event['cache'] == 'hit'
+            totals['cache_misses'] += event['cache'] == 'miss'
+            for name, seconds in event['stages'].items():
+                totals['stages'][name] = totals['stages'].get(name, 0.0) + seconds
+
+    def summary(self):
+        '''
+        Return the totals as a DataFrame with one row per getter, including the
+        total seconds spent in each stage as <stage>_seconds columns.
+        '''
+        with self._lock:
+            rows = [
+                {
+                    'function': function,
+                    **{key: value for key, value in totals.items() if key != 'stages'},
+                    **{f'{name}_seconds': seconds for name, seconds in totals['stages'].items()},
+                }
+                for function, totals in self._totals.items()
+            ]
+        return pd.DataFrame(rows).set_index('function') if rows else pd.DataFrame()
+
+    def reset(self):
+        '''Drop every total.'''
+        with self._lock:
+            self._totals.clear()
@@ -0,0 +1,121 @@
+'''
+This file contains a panel builder for peer benchmarking across FERC Form 2 and
+Form 6 filers.
+
+build_panel loads one statement for a set of entities and report years into a
+dense entity x year x line item NumPy array, with label indexes for each axis.
+Slices such as "operating_revenues for all pipelines, 2019-2025" are then plain
+NumPy indexing, with no per-row Python work.
+'''
+
+import numpy as np
+import pandas as pd
+
+from ferc_forms import get_statement_getter
+from ferc_periods import annual_rows
+from ferc_sqlite import DATE_COLUMNS, IDENTIFIER_COLUMNS
+
+
+class StatementPanel:
+    '''
+    One statement as a dense array of shape (entities, years, line items).
+    Missing values are NaN.
+
+    Parameters:
+        values (object): the NumPy array of line item values
+        entity_ids (tuple): the entity_id of each position on the first axis
+        years (tuple): the report year of each position on the second axis
+        items (tuple): the line item of each position on the third axis
+    '''
+
+    def __init__(self, values, entity_ids, years, items):
+        self.values = values
+        self.entity_ids = tuple(entity_ids)
+        self.years = tuple(years)
+        self.items = tuple(items)
+        self._entity_index = {entity_id: i for i, entity_id in enumerate(self.entity_ids)}
+        self._year_index = {year: i for i, year in enumerate(self.years)}
+        self._item_index = {item: i for i, item in enumerate(self.items)}
+
+    @staticmethod
+    def _positions(index, labels):
+        if labels is None:
+            return np.arange(len(index))
+        if isinstance(labels, (str, int, np.integer)):
+            labels = [labels]
+        missing = [label for label in labels if label not in index]
+        if missing:
+            raise KeyError(f'Not in the panel: {missing}')
+        return np.array([index[label] for label in labels], dtype=np.intp)
+
+    def select(self, items=None, entity_ids=None, years=None):
+        '''
+        Return a sub-array of shape (entities, years, items) for the given labels.
+        Each argument may be a single label, a list of labels, or None for all.
+        '''
+        return self.values[np.ix_(
+            self._positions(self._entity_index, entity_ids),
+            self._positions(self._year_index, years),
+            self._positions(self._item_index, items),
+        )]
+
+    def item(self, item, entity_ids=None, years=None):
+        '''
+        Return one line item as a DataFrame of entities x years.
+
+        Parameters:
+            item (string): the line item, e.g. 'operating_revenues'
+            entity_ids (iterable): the entities to include, or None for all
+            years (iterable): the report years to include, or None for all
+
+        Returns:
+            DataFrame (object): the values, indexed by entity_id with a column per year
+        '''
+        entity_positions = self._positions(self._entity_index, entity_ids)
+        year_positions = self._positions(self._year_index, years)
+        values = self.values[np.ix_(entity_positions, year_positions, [self._item_index[item]])]
+        return pd.DataFrame(
+            values[:, :, 0],
+            index=pd.Index([self.entity_ids[i] for i in entity_positions], name='entity_id'),
+            columns=pd.Index([self.years[i] for i in year_positions], name='report_year'),
+        )
+
+
+# Build a panel from a statement
+def build_panel(db_file, form, statement, subject_id=None, years=None, items=None, dimensions=None):
+    '''
+    Load one statement for a set of entities and years into a StatementPanel.
+    Only the latest filing for each reporting period is used, and for duration
+    statements only annual periods. Each value is placed by report year, the
+    year of end_date (duration statements) or date (instant statements).
+
+    Parameters:
+        db_file (object): Path to PUDL FERC sqlite database file, or an open sqlite3 connection
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statement (string): the statement name, e.g. 'income_statement'
+        subject_id (string or iterable): the entity_id(s) to load, or None for every entity
+        years (iterable): the report years to keep, or None for every year
+        items (iterable): the line items to keep, or None for every line item
+        dimensions (dict): the value to keep for each *_axis column, e.g.
+            {'utility_type_axis': 'total'}. Required for statements with such columns
+
+    Returns:
+        StatementPanel (object): the statement as an entity x year x line item array
+    '''
+    df = get_statement_getter(form, statement)(db_file, subject_id, latest=True)
+    df = annual_rows(df, dimensions, years)
+
+    if items is None:
+        labels = set(IDENTIFIER_COLUMNS + DATE_COLUMNS) | {'report_year'}
+        items = [
+            column for column in df.columns if column not in labels and not column.endswith('_axis')
+        ]
+    items = list(items)
+
+    # Scatter the rows into the dense array in one vectorized assignment
+    entity_codes, entity_ids = pd.factorize(df['entity_id'], sort=True)
+    year_codes, panel_years = pd.factorize(df['report_year'], sort=True)
+    values = np.full((len(entity_ids), len(panel_years), len(items)), np.nan)
+    values[entity_codes, year_codes, :] = df[items].to_numpy(dtype=float, na_value=np.nan)
+
+    return StatementPanel(values, entity_ids, [int(year) for year in panel_years], items)
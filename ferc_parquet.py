@@ -0,0 +1,179 @@
+'''
+This file contains functions to cache FERC Form 2 and Form 6 statements as Parquet
+datasets and to read them back.
+
+export_statements writes each statement a getter produces to a Hive-partitioned
+dataset laid out as
+
+    <store_dir>/form=ferc6/statement=income_statement/report_year=2024/...
+
+read_statement then serves getter-shaped DataFrames from that columnar store,
+reading only the requested columns and pushing entity_id and report_year filters
+down to the Parquet reader. Requires pyarrow.
+'''
+
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from ferc_forms import FORMS, get_statement_getter
+from ferc_statements import FILING_COLUMNS, PERIOD_COLUMNS, get_statement_spec
+
+
+# Keep row groups small enough that entity_id statistics can skip most of them
+ROWS_PER_GROUP = 16384
+
+
+# Derive the report year partition from the period column
+def _report_year(df):
+    period_column = 'end_date' if 'end_date' in df.columns else 'date'
+    year = pd.to_numeric(df[period_column].str.slice(0, 4), errors='coerce')
+    return year.astype('Int64')
+
+
+# Arrow schema of a statement
+def statement_schema(spec):
+    '''
+    Return the fixed Arrow schema of a StatementSpec: strings for the filing,
+    period and *_axis columns and float64 for every line item. Writes use it
+    instead of inferring types per batch, where a line item that is all NULL
+    would otherwise be stored with the Arrow null type.
+
+    Parameters:
+        spec (object): the StatementSpec
+
+    Returns:
+        Schema (object): the pyarrow schema of the statement columns, in order
+    '''
+    text_columns = set(FILING_COLUMNS + PERIOD_COLUMNS[spec.period_type])
+    return pa.schema([
+        (column, pa.string() if column in text_columns or column.endswith('_axis') else pa.float64())
+        for column in dict.fromkeys(spec.columns)
+    ])
+
+
+# Schema of a statement's dataset, including the report_year partition column
+def _dataset_schema(form, statement):
+    schema = statement_schema(get_statement_spec(form, statement))
+    return schema.append(pa.field('report_year', pa.int64()))
+
+
+# Directory of one statement in the Parquet store
+def statement_directory(store_dir, form, statement):
+    '''Return the Path of a statement's dataset inside a Parquet store.'''
+    return Path(store_dir) / f'form={form}' / f'statement={statement}'
+
+
+# Write statement rows to the Parquet store
+def write_statement_frame(df, store_dir, form, statement, replace=True, basename='part'):
+    '''
+    Write statement rows to the statement's dataset in a Parquet store. Rows are
+    sorted by entity_id so row group statistics make entity filters selective.
+
+    Parameters:
+        df (object): A Pandas DataFrame returned by the statement's getter
+        store_dir (object): Path to the root directory of the Parquet store
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statement (string): the statement name, e.g. 'income_statement'
+        replace (bool): delete the statement's existing dataset first; otherwise
+            the rows are added next to it
+        basename (string): the file name prefix of the new Parquet files, which
+            must differ from earlier writes when adding rows
+
+    Returns:
+        int: the number of rows written
+    '''
+    # Parquet needs unique column names
+    df = df.loc[:, ~df.columns.duplicated()]
+    df = df.assign(report_year=_report_year(df))
+    df = df.sort_values(['entity_id', 'publication_time'], kind='stable')
+
+    statement_dir = statement_directory(store_dir, form, statement)
+    if replace and statement_dir.exists():
+        shutil.rmtree(statement_dir)
+
+    table = pa.Table.from_pandas(df, schema=_dataset_schema(form, statement), preserve_index=False)
+    ds.write_dataset(
+        table,
+        statement_dir,
+        format='parquet',
+        partitioning=ds.partitioning(pa.schema([('report_year', pa.int64())]), flavor='hive'),
+        basename_template=basename + '-{i}.parquet',
+        existing_data_behavior='overwrite_or_ignore',
+        max_rows_per_group=ROWS_PER_GROUP,
+        min_rows_per_group=min(ROWS_PER_GROUP, max(len(df), 1)),
+    )
+
+    return len(df)
+
+
+# Write every statement of a form to the Parquet store
+def export_statements(db_file, form, store_dir, statements=None):
+    '''
+    Extract whole statement tables out of a PUDL FERC sqlite file and write them
+    to Parquet datasets partitioned by form, statement and report year. A
+    statement that was exported before is replaced.
+
+    Parameters:
+        db_file (object): Path to PUDL FERC sqlite database file, or an open sqlite3 connection
+        form (string): the form name, 'ferc2' or 'ferc6'
+        store_dir (object): Path to the root directory of the Parquet store
+        statements (iterable): the statement names to export. Defaults to all
+            statements of the form
+
+    Returns:
+        dict: the number of rows written per statement
+    '''
+    if statements is None:
+        statements = FORMS[form]
+
+    row_counts = {}
+    for statement in statements:
+        df = get_statement_getter(form, statement)(db_file, None)
+        row_counts[statement] = write_statement_frame(df, store_dir, form, statement)
+
+    return row_counts
+
+
+# Read a statement back from the Parquet store
+def read_statement(store_dir, form, statement, subject_id=None, years=None, columns=None):
+    '''
+    Read a statement out of a Parquet store written by export_statements. The
+    result has the same columns, in the same order, as the statement's getter.
+
+    Parameters:
+        store_dir (object): Path to the root directory of the Parquet store
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statement (string): the statement name, e.g. 'income_statement'
+        subject_id (string or iterable): the entity_id(s) to filter by, or None
+            for every entity
+        years (iterable): report years to read, or None for every year
+        columns (iterable): the columns to read, or None for every statement column
+
+    Returns:
+        DataFrame (object): A Pandas DataFrame of the filtered statement
+    '''
+    # Fail early on an unknown form or statement
+    get_statement_getter(form, statement)
+
+    statement_dir = statement_directory(store_dir, form, statement)
+    # The fixed schema also reads files whose all-NULL columns were written with the null type
+    dataset = ds.dataset(
+        statement_dir, schema=_dataset_schema(form, statement), format='parquet', partitioning='hive'
+    )
+
+    predicate = None
+    if subject_id is not None:
+        entity_ids = [subject_id] if isinstance(subject_id, str) else list(subject_id)
+        predicate = ds.field('entity_id').isin(entity_ids)
+    if years is not None:
+        year_filter = ds.field('report_year').isin([int(year) for year in years])
+        predicate = year_filter if predicate is None else predicate & year_filter
+
+    if columns is None:
+        columns = [name for name in dataset.schema.names if name != 'report_year']
+
+    return dataset.to_table(columns=list(columns), filter=predicate).to_pandas()
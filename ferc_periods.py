@@ -0,0 +1,211 @@
+'''
+This file contains a period-alignment engine for multi-year comparisons of FERC
+Form 2 and Form 6 statements.
+
+Balance sheets report instants (date) while income and cash flow statements
+report durations (start_date, end_date), and every filing repeats the prior
+period next to the current one. annual_rows reduces a statement to one row per
+entity and report year, taking the latest filing that reports each year.
+align_statements joins several statements of a form on the sorted (entity_id,
+report_year) key, reading only the requested line items, and year_over_year
+computes the changes and growth rates of every line item in one vectorized pass.
+'''
+
+import numpy as np
+import pandas as pd
+
+from ferc_sqlite import as_entity_ids, extract_statement, open_database, period_columns
+from ferc_statements import FILING_COLUMNS, PERIOD_COLUMNS, STATEMENT_SPECS, get_statement_spec
+
+
+# Duration rows shorter than this are not annual figures
+MIN_ANNUAL_DAYS = 300
+
+
+# Reduce a statement to one row per entity and report year
+def annual_rows(df, dimensions=None, years=None):
+    '''
+    Keep one row per entity and report year of a statement DataFrame. The report
+    year is the year of end_date (duration statements) or date (instant
+    statements). Duration rows shorter than MIN_ANNUAL_DAYS are dropped, and of
+    several rows for the same year the one with the latest publication_time is kept.
+
+    Parameters:
+        df (object): A Pandas DataFrame returned by a statement getter
+        dimensions (dict): the value to keep for each *_axis column, e.g.
+            {'utility_type_axis': 'total'}. Required for statements with such columns
+        years (iterable): the report years to keep, or None for every year
+
+    Returns:
+        DataFrame (object): the rows with an added report_year column, sorted by
+            entity_id and report_year
+
+    Raises:
+        ValueError: if a *_axis column has no value in dimensions
+    '''
+    df = df.loc[:, ~df.columns.duplicated()]
+
+    axes = [column for column in period_columns(tuple(df.columns)) if column.endswith('_axis')]
+    dimensions = dimensions or {}
+    unfixed = [axis for axis in axes if axis not in dimensions]
+    if unfixed:
+        raise ValueError(f'The statement has dimension columns {unfixed}; pass dimensions')
+    for axis in axes:
+        df = df[df[axis] == dimensions[axis]]
+
+    if 'date' in df.columns:
+        period_end = pd.to_datetime(df['date'], errors='coerce')
+    else:
+        period_end = pd.to_datetime(df['end_date'], errors='coerce')
+        period_start = pd.to_datetime(df['start_date'], errors='coerce')
+        annual = (period_end - period_start).dt.days >= MIN_ANNUAL_DAYS
+        df, period_end = df[annual], period_end[annual]
+
+    df = df.assign(report_year=period_end.dt.year)
+    df = df[df['report_year'].notna()]
+    df = df.assign(report_year=df['report_year'].astype(int))
+    if years is not None:
+        df = df[df['report_year'].isin(list(years))]
+    df = df.sort_values(['entity_id', 'report_year', 'publication_time'], kind='stable')
+
+    return df.drop_duplicates(['entity_id', 'report_year'], keep='last')
+
+
+# Read one statement as annual rows of the requested line items
+def read_annual(db_file, form, statement, subject_id=None, years=None, items=None, dimensions=None):
+    '''
+    Read one statement as one row per entity and report year, projecting the
+    query down to the requested line items.
+
+    Parameters:
+        db_file (object): Path to PUDL FERC sqlite database file, or an open sqlite3 connection
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statement (string): the statement name, e.g. 'income_statement'
+        subject_id (string or iterable): the entity_id(s) to read, or None for every entity
+        years (iterable): the report years to keep, or None for every year
+        items (iterable): the line items to read, or None for every line item
+        dimensions (dict): the value to keep for each *_axis column; see annual_rows
+
+    Returns:
+        DataFrame (object): the line items, indexed by entity_id and report_year
+
+    Raises:
+        KeyError: if a line item is not part of the statement
+    '''
+    spec = get_statement_spec(form, statement)
+    labels = FILING_COLUMNS + PERIOD_COLUMNS[spec.period_type]
+    axes = tuple(column for column in spec.columns if column.endswith('_axis'))
+    line_items = [column for column in spec.columns if column not in labels + axes]
+    if items is not None:
+        missing = [item for item in items if item not in line_items]
+        if missing:
+            raise KeyError(f'{form} {statement} has no line items {missing}')
+        line_items = list(dict.fromkeys(items))
+
+    # Only the label, dimension and requested columns are read from SQLite
+    projected = spec._replace(columns=labels + axes + tuple(line_items))
+    df = extract_statement(db_file, projected, subject_id, latest=True)
+    df = annual_rows(df, dimensions, years)
+
+    return df.set_index(['entity_id', 'report_year'])[line_items].astype(float)
+
+
+# Join the annual rows of several statements
+def align_statements(
+    db_file, form, statements=None, subject_id=None, years=None, items=None, dimensions=None
+):
+    '''
+    Align several statements of a form by entity and report year, so balance
+    sheet instants and income and cash flow durations of the same fiscal year
+    share one row. All statements are read on one connection.
+
+    Parameters:
+        db_file (object): Path to PUDL FERC sqlite database file, or an open sqlite3 connection
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statements (iterable): the statement names, or None for every statement of the form
+        subject_id (string or iterable): the entity_id(s) to read, or None for every entity
+        years (iterable): the report years to keep, or None for every year
+        items (iterable): the line items to read, or None for every line item.
+            Statements without any of them are skipped
+        dimensions (dict): the value to keep for each *_axis column; see annual_rows
+
+    Returns:
+        DataFrame (object): the line items, indexed by entity_id and report_year.
+            A line item reported by several statements is taken from the first
+    '''
+    if statements is None:
+        statements = list(STATEMENT_SPECS[form])
+    # Every statement reads these, so one-shot iterators must not be used up by the first
+    if subject_id is not None:
+        subject_id = as_entity_ids(subject_id)
+    if years is not None:
+        years = list(years)
+    if items is not None:
+        items = list(items)
+
+    frames = []
+    with open_database(db_file) as conn:
+        for statement in statements:
+            spec = get_statement_spec(form, statement)
+            statement_items = None
+            if items is not None:
+                statement_items = [item for item in items if item in spec.columns]
+                if not statement_items:
+                    continue
+            frames.append(read_annual(
+                conn, form, statement, subject_id, years, statement_items, dimensions
+            ))
+
+    if not frames:
+        index = pd.MultiIndex.from_arrays([[], []], names=['entity_id', 'report_year'])
+        return pd.DataFrame(index=index)
+
+    aligned = frames[0]
+    for frame in frames[1:]:
+        frame = frame.loc[:, ~frame.columns.isin(aligned.columns)]
+        aligned = aligned.join(frame, how='outer', sort=True)
+
+    if items is not None:
+        aligned = aligned[[item for item in dict.fromkeys(items) if item in aligned.columns]]
+    return aligned.sort_index()
+
+
+# Year-over-year changes of every line item at once
+def year_over_year(aligned, items=None, periods=1):
+    '''
+    Compute the change and growth rate of line items against the same entity's
+    value periods years earlier. The earlier values are looked up by key, so
+    gaps in an entity's years give NaN rather than comparing non-adjacent years.
+    Growth is the change over the absolute earlier value, and NaN where that
+    value is zero or missing.
+
+    Parameters:
+        aligned (object): A DataFrame indexed by entity_id and report_year, as
+            returned by align_statements or read_annual
+        items (iterable): the line items to compare, or None for every column
+        periods (int): the number of years to look back
+
+    Returns:
+        DataFrame (object): the same index, with <item>, <item>_change and
+            <item>_growth columns for each line item
+    '''
+    items = list(aligned.columns if items is None else items)
+    current = aligned[items].to_numpy(dtype=float, na_value=np.nan)
+
+    entity_ids = aligned.index.get_level_values('entity_id')
+    earlier_years = aligned.index.get_level_values('report_year') - periods
+    earlier_index = pd.MultiIndex.from_arrays([entity_ids, earlier_years])
+    earlier = aligned[items].reindex(earlier_index).to_numpy(dtype=float, na_value=np.nan)
+
+    change = current - earlier
+    base = np.abs(earlier)
+    growth = np.divide(
+        change, base, out=np.full(change.shape, np.nan), where=~np.isnan(base) & (base != 0)
+    )
+
+    columns = {}
+    for position, item in enumerate(items):
+        columns[item] = current[:, position]
+        columns[f'{item}_change'] = change[:, position]
+        columns[f'{item}_growth'] = growth[:, position]
+    return pd.DataFrame(columns, index=aligned.index)
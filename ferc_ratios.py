@@ -0,0 +1,164 @@
+'''
+This file contains a financial ratio engine over FERC Form 2 and Form 6 statements.
+
+Each ratio is declared as signed numerator and denominator line items of one
+statement. ratio_table loads each statement table once and evaluates all of its
+ratios as vectorized NumPy expressions over every entity and period, so ratio
+tables for a whole release take one query per statement.
+'''
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from ferc_forms import get_statement_getter
+from ferc_validation import REPORT_LABELS
+
+
+# numerator / denominator, each a sum of line items; a term starting with '-' is subtracted
+Ratio = namedtuple('Ratio', ['name', 'form', 'statement', 'numerator', 'denominator'])
+
+
+# The ratios computed by default
+RATIOS = (
+    # Form 6 Income Statement
+    Ratio(
+        'ferc6_operating_ratio', 'ferc6', 'income_statement',
+        ('operating_expenses',), ('operating_revenues',),
+    ),
+    Ratio(
+        'ferc6_operating_margin', 'ferc6', 'income_statement',
+        ('net_carrier_operating_income',), ('operating_revenues',),
+    ),
+    Ratio(
+        'ferc6_net_margin', 'ferc6', 'income_statement',
+        ('net_income_loss',), ('operating_revenues',),
+    ),
+    # Form 6 Balance Sheet
+    Ratio(
+        'ferc6_debt_to_equity', 'ferc6', 'balance_sheet',
+        ('long_term_debt_payable_after_one_year', 'long_term_debt_payable_within_one_year'),
+        ('stockholders_equity',),
+    ),
+    Ratio(
+        'ferc6_current_ratio', 'ferc6', 'balance_sheet',
+        ('current_assets',), ('current_liabilities',),
+    ),
+    Ratio(
+        'ferc6_equity_ratio', 'ferc6', 'balance_sheet',
+        ('stockholders_equity',), ('assets',),
+    ),
+    # Form 6 Cash Flow Statement
+    Ratio(
+        'ferc6_cash_conversion', 'ferc6', 'cash_flow_statement',
+        ('net_cash_provided_by_used_in_operating_activities',), ('net_income_loss',),
+    ),
+    # Form 2 Statement of Income
+    Ratio(
+        'ferc2_operating_ratio', 'ferc2', 'statement_of_income',
+        ('utility_operating_expenses',), ('operating_revenues',),
+    ),
+    Ratio(
+        'ferc2_operating_margin', 'ferc2', 'statement_of_income',
+        ('net_utility_operating_income',), ('operating_revenues',),
+    ),
+    Ratio(
+        'ferc2_net_margin', 'ferc2', 'statement_of_income',
+        ('net_income_loss',), ('operating_revenues',),
+    ),
+    # Form 2 Balance Sheet liabilities and equity
+    Ratio(
+        'ferc2_debt_to_equity', 'ferc2', 'balance_sheet_liabilities_and_equity',
+        ('long_term_debt',), ('proprietary_capital',),
+    ),
+    Ratio(
+        'ferc2_debt_to_capital', 'ferc2', 'balance_sheet_liabilities_and_equity',
+        ('long_term_debt',), ('long_term_debt', 'proprietary_capital'),
+    ),
+    # Form 2 Statement of Cash Flows
+    Ratio(
+        'ferc2_cash_conversion', 'ferc2', 'statement_of_cash_flows',
+        ('net_cash_provided_by_used_in_operating_activities',), ('net_income_loss',),
+    ),
+)
+
+
+# Sum the signed terms of a numerator or denominator over every row
+def _signed_sum(df, terms):
+    signs = np.array([-1.0 if term.startswith('-') else 1.0 for term in terms])
+    values = df[[term.lstrip('-') for term in terms]].to_numpy(dtype=float, na_value=np.nan)
+    total = np.nansum(values * signs, axis=1)
+    total[np.isnan(values).all(axis=1)] = np.nan
+    return total
+
+
+# Evaluate the ratios of one statement over a whole table
+def compute_ratios(df, ratios):
+    '''
+    Evaluate ratios over every row of a statement DataFrame at once. Within a
+    numerator or denominator missing terms count as zero, but a side whose terms
+    are all missing is missing. A ratio is NaN where either side is missing or
+    the denominator is zero.
+
+    Parameters:
+        df (object): A Pandas DataFrame returned by a statement getter
+        ratios (iterable): the Ratio definitions to evaluate
+
+    Returns:
+        DataFrame (object): the labels of each filing row and a column per ratio
+    '''
+    labels = [column for column in REPORT_LABELS if column in df.columns]
+    result = df[labels].reset_index(drop=True)
+
+    for ratio in ratios:
+        numerator = _signed_sum(df, ratio.numerator)
+        denominator = _signed_sum(df, ratio.denominator)
+        defined = ~np.isnan(numerator) & ~np.isnan(denominator) & (denominator != 0)
+        result[ratio.name] = np.divide(
+            numerator, denominator, out=np.full(len(df), np.nan), where=defined
+        )
+
+    return result
+
+
+# Compute every ratio for a release
+def ratio_table(db_files, ratios=RATIOS, latest=True):
+    '''
+    Compute ratios for every entity and period in PUDL FERC sqlite databases.
+    Each statement table is read once, whatever the number of ratios on it.
+
+    Parameters:
+        db_files (dict): Path to the PUDL sqlite database file per form,
+            e.g. {'ferc2': 'ferc2_xbrl.sqlite', 'ferc6': 'ferc6_xbrl.sqlite'}.
+            Ratios of forms left out are skipped
+        ratios (iterable): the Ratio definitions to compute. Defaults to RATIOS
+        latest (bool): use only the latest filing for each reporting period
+
+    Returns:
+        DataFrame (object): one row per (ratio, filing row) with the ratio name,
+            the labels of the filing row and the value. Undefined ratios are left out
+    '''
+    by_statement = {}
+    for ratio in ratios:
+        if ratio.form in db_files:
+            by_statement.setdefault((ratio.form, ratio.statement), []).append(ratio)
+
+    tables = []
+    for (form, statement), statement_ratios in by_statement.items():
+        df = get_statement_getter(form, statement)(db_files[form], None, latest=latest)
+        wide = compute_ratios(df, statement_ratios)
+        labels = [column for column in wide.columns if column in REPORT_LABELS]
+        for ratio in statement_ratios:
+            values = wide[ratio.name]
+            table = wide.loc[values.notna(), labels].reset_index(drop=True)
+            table.insert(0, 'ratio', ratio.name)
+            table['value'] = values[values.notna()].to_numpy()
+            tables.append(table)
+
+    if not tables:
+        return pd.DataFrame(columns=['ratio', *REPORT_LABELS, 'value'])
+
+    table = pd.concat(tables, ignore_index=True)
+    labels = [column for column in REPORT_LABELS if column in table.columns]
+    return table[['ratio', *labels, 'value']]
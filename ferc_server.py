@@ -0,0 +1,381 @@
+'''
+This file contains a local HTTP service for the FERC Form 2 and Form 6 statement
+getters, built on the standard library's ThreadingHTTPServer.
+
+The service keeps a pool of open read-only connections per database, so requests
+skip connection setup, and caches encoded responses in memory. Every response
+carries an ETag derived from the database file's path, size and modification
+time, so clients can revalidate with If-None-Match and a new PUDL release
+invalidates both the ETags and the cache.
+
+    python ferc_server.py --ferc2 ferc2_xbrl.sqlite --ferc6 ferc6_xbrl.sqlite --port 8000
+
+Endpoints:
+
+    GET /forms                                    the forms and their statements
+    GET /<form>/entities                          the entity_ids of a form
+    GET /<form>/<statement>                       a statement for every entity
+    GET /<form>/<statement>/<entity_id>           a statement for one entity
+
+Forms are accepted as form6 or ferc6 and statements with dashes or underscores.
+Statement endpoints take ?entity_id=... (repeatable), ?latest=1 and
+?format=json or ?format=arrow; Arrow IPC streams are also chosen by an Accept
+header of application/vnd.apache.arrow.stream and need pyarrow.
+'''
+
+import argparse
+import hashlib
+import json
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ferc_cache import database_fingerprint
+from ferc_forms import FORM_TABLES, FORMS, get_statement_getter
+from ferc_sqlite import connect_read_only, list_entity_ids, read_only_options
+
+
+ARROW_CONTENT_TYPE = 'application/vnd.apache.arrow.stream'
+JSON_CONTENT_TYPE = 'application/json'
+
+
+# Open read-only connections to one database file, reused across requests
+class ConnectionPool:
+    '''
+    A pool of read-only connections to one database file, opened on demand and
+    kept open between requests.
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file
+        max_idle (int): the most idle connections kept open
+    '''
+
+    def __init__(self, db_file, max_idle=8):
+        self.db_file = db_file
+        self.fingerprint = database_fingerprint(db_file)
+        self._idle = queue.LifoQueue(max_idle)
+        self._closed = False
+
+    def acquire(self):
+        '''Return an idle connection, or a new one if none is idle.'''
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            options = read_only_options() or {}
+            return connect_read_only(self.db_file, check_same_thread=False, **options)
+
+    def release(self, conn):
+        '''Return a connection to the pool, closing it if the pool is full or closed.'''
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        '''Close the idle connections; connections in use are closed on release.'''
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# An LRU of encoded responses, evicted by total size
+class ResponseCache:
+    '''
+    An LRU cache of encoded response bodies bounded by their total size.
+
+    Parameters:
+        max_bytes (int): the memory budget for cached responses
+    '''
+
+    def __init__(self, max_bytes=256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        '''Return the cached (content type, body) for key, or None on a miss.'''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, content_type, body):
+        '''Cache a response body under key.'''
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= len(self._entries.pop(key)[1])
+            self._entries[key] = (content_type, body)
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def clear(self):
+        '''Drop every cached response.'''
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+# Raised by the service for requests it can't answer
+class RequestError(Exception):
+    '''A request error with the HTTP status to answer it with.'''
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Encode a statement DataFrame for the response
+def encode_frame(df, output_format):
+    '''
+    Encode a DataFrame as JSON records or an Arrow IPC stream.
+
+    Parameters:
+        df (object): the Pandas DataFrame to encode
+        output_format (string): 'json' or 'arrow'
+
+    Returns:
+        tuple: the content type and the encoded bytes
+    '''
+    if output_format == 'arrow':
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return ARROW_CONTENT_TYPE, sink.getvalue().to_pybytes()
+
+    return JSON_CONTENT_TYPE, df.to_json(orient='records').encode()
+
+
+class StatementService:
+    '''
+    The request handling behind the HTTP server, usable without it: resolves a
+    path and query to a getter call on a pooled connection, and caches the
+    encoded responses per database fingerprint.
+
+    Parameters:
+        db_files (dict): Path to the PUDL sqlite database file per form,
+            e.g. {'ferc2': 'ferc2_xbrl.sqlite', 'ferc6': 'ferc6_xbrl.sqlite'}
+        cache_bytes (int): the memory budget for cached responses
+    '''
+
+    def __init__(self, db_files, cache_bytes=256 * 1024 ** 2):
+        self.db_files = dict(db_files)
+        self.cache = ResponseCache(cache_bytes)
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, form):
+        # A changed file gets a fresh pool, so no connection reads the old release
+        fingerprint = database_fingerprint(self.db_files[form])
+        with self._lock:
+            pool = self._pools.get(form)
+            if pool is None or pool.fingerprint != fingerprint:
+                if pool is not None:
+                    pool.close()
+                pool = self._pools[form] = ConnectionPool(self.db_files[form])
+        return pool
+
+    def _form(self, name):
+        form = 'ferc' + name[len('form'):] if name.startswith('form') else name
+        if form not in self.db_files:
+            message = f'Unknown form {name!r}, expected one of {sorted(self.db_files)}'
+            raise RequestError(HTTPStatus.NOT_FOUND, message)
+        return form
+
+    def etag(self, path, query, output_format):
+        '''
+        Return the ETag of a request: a hash of the path, query, format and the
+        fingerprint of the database of the form named in the path. A new release
+        of one form leaves the ETags of the other form valid, and /forms, which
+        reads no database, has no fingerprint.
+        '''
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        fingerprint = None
+        if parts and parts != ['forms']:
+            try:
+                fingerprint = database_fingerprint(self.db_files[self._form(parts[0])])
+            except RequestError:
+                # respond answers the unknown form with 404
+                pass
+        key = repr((fingerprint, path, sorted(query.items()), output_format)).encode()
+        return '"' + hashlib.sha256(key).hexdigest()[:32] + '"'
+
+    def respond(self, path, query, output_format='json'):
+        '''
+        Answer a GET request.
+
+        Parameters:
+            path (string): the request path, e.g. '/form6/income-statement/C001041'
+            query (dict): the query parameters, as returned by urllib.parse.parse_qs
+            output_format (string): 'json' or 'arrow'
+
+        Returns:
+            tuple: the content type and the body bytes
+
+        Raises:
+            RequestError: for unknown routes, forms, statements or parameters
+        '''
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+
+        if parts == ['forms']:
+            body = {form: list(FORMS[form]) for form in sorted(self.db_files)}
+            return JSON_CONTENT_TYPE, json.dumps(body).encode()
+
+        if len(parts) == 2 and parts[1] == 'entities':
+            form = self._form(parts[0])
+            with self._connection(form) as conn:
+                entity_ids = list_entity_ids(conn, FORM_TABLES[form])
+            return JSON_CONTENT_TYPE, json.dumps(entity_ids).encode()
+
+        if len(parts) not in (2, 3):
+            raise RequestError(HTTPStatus.NOT_FOUND, f'No route for {path!r}')
+
+        form = self._form(parts[0])
+        try:
+            getter = get_statement_getter(form, parts[1].replace('-', '_'))
+        except KeyError as error:
+            raise RequestError(HTTPStatus.NOT_FOUND, error.args[0]) from None
+
+        subject_id = query.get('entity_id')
+        if len(parts) == 3:
+            subject_id = [parts[2]] + (subject_id or [])
+        latest = query.get('latest', ['0'])[-1].lower() in ('1', 'true', 'yes')
+
+        fingerprint = self._pool(form).fingerprint
+        key = (fingerprint, form, parts[1], tuple(subject_id or ()), latest, output_format)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        with self._connection(form) as conn:
+            df = getter(conn, subject_id, latest)
+        content_type, body = encode_frame(df, output_format)
+        self.cache.put(key, content_type, body)
+        return content_type, body
+
+    @contextmanager
+    def _connection(self, form):
+        pool = self._pool(form)
+        conn = pool.acquire()
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+
+    def close(self):
+        '''Close every pooled connection and drop the cache.'''
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.close()
+        self.cache.clear()
+
+
+# Build a request handler class bound to a service
+def make_handler(service):
+    '''Return a BaseHTTPRequestHandler subclass that answers GET requests from service.'''
+
+    class StatementRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            output_format = query.get('format', [None])[-1]
+            if output_format is None:
+                accept = self.headers.get('Accept', '')
+                output_format = 'arrow' if ARROW_CONTENT_TYPE in accept else 'json'
+            if output_format not in ('json', 'arrow'):
+                return self._send_error(HTTPStatus.BAD_REQUEST, f'Unknown format {output_format!r}')
+
+            query.pop('format', None)
+            try:
+                etag = service.etag(url.path, query, output_format)
+                if etag in self.headers.get('If-None-Match', ''):
+                    return self._send(HTTPStatus.NOT_MODIFIED, None, b'', etag)
+                content_type, body = service.respond(url.path, query, output_format)
+            except RequestError as error:
+                return self._send_error(error.status, str(error))
+            except Exception as error:
+                return self._send_error(HTTPStatus.INTERNAL_SERVER_ERROR, repr(error))
+
+            self._send(HTTPStatus.OK, content_type, body, etag)
+
+        def _send(self, status, content_type, body, etag=None):
+            self.send_response(status)
+            if content_type is not None:
+                self.send_header('Content-Type', content_type)
+            if etag is not None:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def _send_error(self, status, message):
+            self._send(status, JSON_CONTENT_TYPE, json.dumps({'error': message}).encode())
+
+    return StatementRequestHandler
+
+
+# Start the server
+def serve(db_files, host='127.0.0.1', port=8000, cache_bytes=256 * 1024 ** 2):
+    '''
+    Serve the statement getters over HTTP until interrupted.
+
+    Parameters:
+        db_files (dict): Path to the PUDL sqlite database file per form
+        host (string): the address to listen on. Defaults to local connections only
+        port (int): the port to listen on
+        cache_bytes (int): the memory budget for cached responses
+    '''
+    service = StatementService(db_files, cache_bytes)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+# Command line entry point
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve FERC statements over local HTTP.')
+    parser.add_argument('--ferc2', help='the ferc2_xbrl.sqlite database file')
+    parser.add_argument('--ferc6', help='the ferc6_xbrl.sqlite database file')
+    parser.add_argument('--host', default='127.0.0.1', help='the address to listen on')
+    parser.add_argument('--port', type=int, default=8000, help='the port to listen on')
+    parser.add_argument('--cache-mb', type=int, default=256, help='the response cache size')
+    args = parser.parse_args(argv)
+
+    db_files = {
+        form: db_file for form, db_file in (('ferc2', args.ferc2), ('ferc6', args.ferc6)) if db_file
+    }
+    if not db_files:
+        parser.error('pass at least one of --ferc2 and --ferc6')
+    serve(db_files, args.host, args.port, args.cache_mb * 1024 ** 2)
+
+
+if __name__ == '__main__':
+    main()
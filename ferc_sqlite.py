@@ -0,0 +1,615 @@
+'''
+This file contains SQLite helpers shared by the FERC Form 2 and Form 6 extract
+modules.
+'''
+
+import functools
+import json
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ferc_metrics import stage
+
+
+# Stay below SQLite's default limit of 999 host parameters per statement
+MAX_SQL_PARAMETERS = 900
+
+
+# sqlite3 connection that remembers which tables it has already checked
+class FercConnection(sqlite3.Connection):
+    '''
+    A sqlite3 connection that caches the tables whose statement columns have
+    been validated, so PRAGMA table_info runs once per table per connection.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.validated_columns = {}
+
+
+# Use an open connection as-is, or open and close one for a path
+@contextmanager
+def open_database(db_file):
+    '''
+    Yield a sqlite3 connection for db_file. A path is connected to and closed
+    again on exit; an already open connection is passed through untouched.
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file, or an open sqlite3 connection
+
+    Yields:
+        Connection (object): An open sqlite3 connection
+    '''
+    if isinstance(db_file, sqlite3.Connection):
+        yield db_file
+        return
+
+    with stage('connect'):
+        conn = connect(db_file)
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+# Memory map and page cache sizes of the tuned read-only mode
+DEFAULT_MMAP_SIZE = 2 ** 30
+DEFAULT_CACHE_SIZE = -64 * 1024
+
+# Connection options of the read-only mode, or None while it is off
+_read_only_mode = None
+
+
+# Open a database file without write access
+def connect_read_only(db_file, immutable=False, mmap_size=None, cache_size=None, **kwargs):
+    '''
+    Open a read-only FercConnection to a PUDL sqlite database file.
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file
+        immutable (bool): tell SQLite the file never changes, so it skips file
+            locking and change detection. Only safe for files nothing writes to
+        mmap_size (int): read the file through a memory map of up to this many
+            bytes, shared with other processes through the OS page cache
+        cache_size (int): the page cache size; pages when positive, KiB when negative
+        **kwargs: passed on to sqlite3.connect
+
+    Returns:
+        Connection (object): An open, read-only sqlite3 connection
+    '''
+    uri = Path(db_file).resolve().as_uri() + '?mode=ro'
+    if immutable:
+        uri += '&immutable=1'
+    conn = sqlite3.connect(uri, uri=True, factory=FercConnection, **kwargs)
+    if mmap_size is not None:
+        conn.execute(f'PRAGMA mmap_size = {int(mmap_size)}')
+    if cache_size is not None:
+        conn.execute(f'PRAGMA cache_size = {int(cache_size)}')
+    return conn
+
+
+# Switch the getters to the tuned read-only mode
+def set_read_only_mode(enabled=True, mmap_size=DEFAULT_MMAP_SIZE, cache_size=DEFAULT_CACHE_SIZE):
+    '''
+    Make the getters, readers and async getters open database paths read-only,
+    immutable and memory mapped, for the unchanging PUDL downloads. Concurrent
+    readers then share the file through the OS page cache instead of each
+    copying pages into its own cache, and no file locks are taken.
+
+    Don't enable it for a file that may be replaced or written to while open.
+
+    Parameters:
+        enabled (bool): turn the mode on, or off again with False
+        mmap_size (int): the memory map size in bytes per connection
+        cache_size (int): the page cache size; pages when positive, KiB when negative
+    '''
+    global _read_only_mode
+    if enabled:
+        _read_only_mode = {'immutable': True, 'mmap_size': mmap_size, 'cache_size': cache_size}
+    else:
+        _read_only_mode = None
+
+
+def read_only_options():
+    '''Return the connect_read_only options of the read-only mode, or None while it is off.'''
+    return dict(_read_only_mode) if _read_only_mode is not None else None
+
+
+# Open a database path in the current access mode
+def connect(db_file, read_only=None, **kwargs):
+    '''
+    Open a FercConnection to a PUDL sqlite database file, in the read-only mode
+    of set_read_only_mode when it is on.
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file
+        read_only (bool): force the read-only mode on or off for this connection,
+            or None to follow set_read_only_mode
+        **kwargs: passed on to sqlite3.connect
+
+    Returns:
+        Connection (object): An open sqlite3 connection
+    '''
+    if read_only is None:
+        read_only = _read_only_mode is not None
+    if not read_only:
+        return sqlite3.connect(db_file, factory=FercConnection, **kwargs)
+
+    options = _read_only_mode or {
+        'immutable': True, 'mmap_size': DEFAULT_MMAP_SIZE, 'cache_size': DEFAULT_CACHE_SIZE,
+    }
+    return connect_read_only(db_file, **options, **kwargs)
+
+
+# List the entities that appear in any of a set of tables
+def list_entity_ids(conn, sql_tables):
+    '''
+    Return the sorted distinct entity_ids found in any of the given tables.
+
+    Parameters:
+        conn (object): An open sqlite3 connection
+        sql_tables (iterable): the tables to look in
+
+    Returns:
+        list: the entity_ids
+    '''
+    union = ' UNION '.join(f'SELECT entity_id FROM {table}' for table in sql_tables)
+    return [row[0] for row in conn.execute(f'{union} ORDER BY entity_id')]
+
+
+# Columns that identify one reporting period of one entity
+def period_columns(columns):
+    '''
+    Return the columns that identify a reporting period in a statement table:
+    date for instant tables, start_date and end_date for duration tables, plus
+    any XBRL dimension (*_axis) columns such as utility_type_axis.
+
+    Parameters:
+        columns (tuple): the statement columns
+
+    Returns:
+        tuple: the period-identifying columns
+    '''
+    period = ('date',) if 'date' in columns else ('start_date', 'end_date')
+    axes = tuple(column for column in dict.fromkeys(columns) if column.endswith('_axis'))
+    return period + axes
+
+
+# Build a projected SELECT for a statement
+def select_columns(conn, sql_table, columns, latest=False):
+    '''
+    Build a SELECT of only the given columns, in the given order, after checking
+    them against PRAGMA table_info. The check is cached on FercConnection
+    connections, so it runs once per table per connection.
+
+    With latest=True only the most recent publication_time of each entity and
+    reporting period is kept, ranked with a window function inside SQLite.
+    SQLite pushes entity_id filters into the ranked subquery, because entity_id
+    is part of its PARTITION BY.
+
+    Parameters:
+        conn (object): An open sqlite3 connection
+        sql_table (string): the table to select from
+        columns (tuple): the ordered statement columns
+        latest (bool): keep only the latest filing for each reporting period
+
+    Returns:
+        string: A SELECT statement; filters are added by read_entities
+
+    Raises:
+        KeyError: if any of the columns is not in the table
+    '''
+    with stage('prepare'):
+        return _select_columns(conn, sql_table, columns, latest)
+
+
+def _select_columns(conn, sql_table, columns, latest):
+    validated = getattr(conn, 'validated_columns', {})
+    if validated.get(sql_table) != columns:
+        table_columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{sql_table}")')}
+        missing = [column for column in columns if column not in table_columns]
+        if missing:
+            raise KeyError(f'{sql_table} is missing columns: {missing}')
+        validated[sql_table] = columns
+
+    return _build_select(sql_table, tuple(columns), latest)
+
+
+# The SQL text only depends on its arguments, so build each query once
+@functools.lru_cache(maxsize=256)
+def _build_select(sql_table, columns, latest):
+    select_list = ', '.join(f'"{column}"' for column in columns)
+    if not latest:
+        return f'SELECT {select_list} FROM {sql_table}'
+
+    partition = ', '.join(f'"{column}"' for column in ('entity_id',) + period_columns(columns))
+    inner_list = ', '.join(f'"{column}"' for column in dict.fromkeys(columns))
+    return (
+        f'SELECT {select_list} FROM ('
+        f'SELECT {inner_list}, ROW_NUMBER() OVER ('
+        f'PARTITION BY {partition} ORDER BY "publication_time" DESC'
+        f') AS filing_rank FROM {sql_table}'
+        f') WHERE filing_rank = 1'
+    )
+
+
+# Compile a registered statement into its query
+def compile_statement(conn, spec, latest=False):
+    '''
+    Return the projected SELECT of a StatementSpec from ferc_statements, as
+    select_columns builds it. The SQL text of each spec is built once and the
+    column check runs once per FercConnection; the identical text also lets
+    sqlite3 reuse its prepared statement from the connection's statement cache.
+
+    Parameters:
+        conn (object): An open sqlite3 connection
+        spec (object): the StatementSpec to compile
+        latest (bool): keep only the latest filing for each reporting period
+
+    Returns:
+        string: A SELECT statement; filters are added by read_entities
+
+    Raises:
+        KeyError: if any of the statement columns is not in its table
+    '''
+    return select_columns(conn, spec.table, spec.columns, latest)
+
+
+# Normalize the subject_id argument of the getters
+def as_entity_ids(subject_id):
+    '''
+    Turn a single entity_id or an iterable of entity_ids into a tuple.
+
+    Parameters:
+        subject_id (string or iterable): an entity_id, or an iterable of entity_ids
+
+    Returns:
+        tuple: the unique entity_ids, in the order they were first given
+    '''
+    if isinstance(subject_id, str):
+        return (subject_id,)
+
+    return tuple(dict.fromkeys(subject_id))
+
+
+# Columns that become categoricals or datetimes in compact mode
+IDENTIFIER_COLUMNS = ('entity_id', 'filing_name')
+DATE_COLUMNS = ('publication_time', 'start_date', 'end_date', 'date')
+
+
+# Shrink a float column without changing any value
+def _downcast_numeric(values):
+    # Integer dtypes are never used: sums of dollar line items would silently
+    # wrap around in a small integer dtype, and int64 saves nothing over float64
+    finite = values.dropna()
+    if finite.empty or finite.abs().max() > np.finfo(np.float32).max:
+        return values
+
+    as_float32 = values.astype(np.float32)
+    if (as_float32.astype(np.float64) == values)[values.notna()].all():
+        return as_float32
+
+    return values
+
+
+# Convert a statement frame to compact dtypes
+def compact_dtypes(df):
+    '''
+    Convert a statement DataFrame to memory-efficient dtypes without losing
+    information: entity_id, filing_name and *_axis columns become categoricals,
+    publication_time and the period columns become datetime64, and float line
+    items become float32 where that holds every value exactly. Arithmetic on
+    float32 columns rounds to float32 precision, so cast line items back to
+    float64 before summing large amounts.
+
+    Parameters:
+        df (object): A Pandas DataFrame returned by a getter
+
+    Returns:
+        DataFrame (object): the same data with compact dtypes
+    '''
+    df = df.copy()
+    for position, column in enumerate(df.columns):
+        values = df.iloc[:, position]
+        if column in IDENTIFIER_COLUMNS or column.endswith('_axis'):
+            df.isetitem(position, values.astype('category'))
+        elif column in DATE_COLUMNS:
+            df.isetitem(position, pd.to_datetime(values, errors='coerce'))
+        elif pd.api.types.is_float_dtype(values):
+            df.isetitem(position, _downcast_numeric(values))
+
+    return df
+
+
+# Turn the values of a dimension column into column blocks
+def pivot_axis(df, axis, axis_values=None, flatten=False, compact=False):
+    '''
+    Pivot an XBRL dimension column such as utility_type_axis, so each filing and
+    reporting period is one row with a block of line item columns per axis value.
+    The rows are scattered into a dense array in one vectorized assignment
+    instead of a filter and merge per axis value.
+
+    Parameters:
+        df (object): A Pandas DataFrame returned by a getter
+        axis (string): the dimension column to pivot, e.g. 'utility_type_axis'
+        axis_values (iterable): the axis values to keep, in column order. None
+            keeps every value present, sorted. Rows with other values are dropped
+        flatten (bool): return flat <axis value>__<line item> columns next to the
+            label columns, instead of a frame indexed by the labels with
+            (axis value, line item) MultiIndex columns
+        compact (bool): convert the result with compact_dtypes
+
+    Returns:
+        DataFrame (object): one row per filing and reporting period, in the order
+            they first appear in df. Line items missing for an axis value are NaN
+    '''
+    df = df.loc[:, ~df.columns.duplicated()]
+    labels = [
+        column for column in df.columns
+        if column in IDENTIFIER_COLUMNS + DATE_COLUMNS or (column.endswith('_axis') and column != axis)
+    ]
+    items = [column for column in df.columns if column not in labels and column != axis]
+    if axis_values is None:
+        axis_values = sorted(df[axis].dropna().unique())
+    axis_values = list(axis_values)
+
+    # Hash the label columns once; groups are numbered in order of first appearance
+    row_codes = df.groupby(labels, sort=False, dropna=False).ngroup().to_numpy()
+    _, first_rows = np.unique(row_codes, return_index=True)
+    row_labels = df.iloc[first_rows][labels].reset_index(drop=True)
+    axis_codes = pd.Index(axis_values).get_indexer(df[axis])
+    kept = axis_codes >= 0
+
+    values = np.full((len(first_rows), len(axis_values), len(items)), np.nan)
+    values[row_codes[kept], axis_codes[kept], :] = (
+        df[items].to_numpy(dtype=float, na_value=np.nan)[kept]
+    )
+
+    flat_columns = [f'{value}__{item}' for value in axis_values for item in items]
+    result = pd.concat([
+        row_labels,
+        pd.DataFrame(values.reshape(len(first_rows), len(flat_columns)), columns=flat_columns),
+    ], axis=1)
+    if compact:
+        result = compact_dtypes(result)
+    if flatten:
+        return result
+
+    result = result.set_index(labels)
+    result.columns = pd.MultiIndex.from_product([axis_values, items], names=[axis, 'line_item'])
+    return result
+
+
+# Attach the entity filter to a statement query
+def _entity_filter(sql_query, subject_id):
+    '''
+    Return (query, params) for sql_query filtered by one or many entity_ids.
+    Short lists are bound as an IN list; lists longer than MAX_SQL_PARAMETERS
+    are bound as one JSON array parameter and expanded with json_each, so
+    concurrent queries on one connection never share any state.
+    '''
+    if subject_id is None:
+        return sql_query, ()
+
+    entity_ids = as_entity_ids(subject_id)
+    conjunction = ' AND' if ' WHERE ' in sql_query else ' WHERE'
+
+    if len(entity_ids) <= MAX_SQL_PARAMETERS:
+        placeholders = ', '.join('?' * len(entity_ids))
+        return sql_query + f'{conjunction} entity_id IN ({placeholders})', entity_ids
+
+    # Too many ids to bind one by one
+    return (
+        sql_query + f'{conjunction} entity_id IN (SELECT value FROM json_each(?))',
+        (json.dumps(entity_ids),),
+    )
+
+
+# Run a statement query for one or many entities
+def read_entities(conn, sql_query, subject_id, compact=False, params=()):
+    '''
+    Run a SELECT query filtered by one or many entity_ids as a single query.
+    Short lists are bound as an IN list; lists longer than MAX_SQL_PARAMETERS
+    are bound as one JSON array so SQLite's parameter limit is never hit.
+
+    Parameters:
+        conn (object): An open sqlite3 connection
+        sql_query (string): A SELECT statement built by select_columns
+        subject_id (string or iterable): the entity_id(s) to filter the query by,
+            or None to return every entity
+        compact (bool): convert the result with compact_dtypes
+        params (tuple): the parameters of placeholders already in sql_query
+
+    Returns:
+        DataFrame (object): A Pandas DataFrame of the rows for all requested entities
+    '''
+    query, filter_params = _entity_filter(sql_query, subject_id)
+    with stage('query'):
+        cursor = conn.execute(query, tuple(params) + tuple(filter_params))
+        rows = cursor.fetchall()
+        columns = [description[0] for description in cursor.description]
+
+    # Same construction as pd.read_sql, split out so it can be timed separately
+    with stage('frame'):
+        df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+
+    if compact:
+        with stage('compact'):
+            df = compact_dtypes(df)
+
+    return df
+
+
+# Stream a statement query for one or many entities
+def iter_entities(conn, sql_query, subject_id, chunksize, compact=False):
+    '''
+    Like read_entities, but yield the result in DataFrames of at most chunksize
+    rows, so whole tables can be processed at constant memory.
+
+    Parameters:
+        conn (object): An open sqlite3 connection
+        sql_query (string): A SELECT statement built by select_columns
+        subject_id (string or iterable): the entity_id(s) to filter the query by,
+            or None to return every entity
+        chunksize (int): the maximum number of rows per DataFrame
+        compact (bool): convert each chunk with compact_dtypes. Categories are
+            per chunk, so union them before concatenating chunks
+
+    Yields:
+        DataFrame (object): Pandas DataFrames of consecutive rows of the result
+    '''
+    query, params = _entity_filter(sql_query, subject_id)
+    for df in pd.read_sql(query, conn, params=params, chunksize=chunksize):
+        yield compact_dtypes(df) if compact else df
+
+
+# Read a registered statement
+def extract_statement(db_file, spec, subject_id, latest=False, compact=False):
+    '''
+    Extract a registered statement out of a PUDL FERC sqlite file. This is the
+    engine behind every statement getter.
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file, or an open sqlite3 connection
+        spec (object): the StatementSpec to extract
+        subject_id (string or iterable): the entity_id(s) to filter by, or None
+            for every entity
+        latest (bool): return only the latest filing for each reporting period
+        compact (bool): convert the result with compact_dtypes
+
+    Returns:
+        DataFrame (object): A Pandas DataFrame of the statement columns, in statement order
+    '''
+    with open_database(db_file) as conn:
+        sql_query = compile_statement(conn, spec, latest)
+        return read_entities(conn, sql_query, subject_id, compact)
+
+
+# Stream a registered statement
+def iter_statement(db_file, spec, subject_id=None, chunksize=10000, latest=False, compact=False):
+    '''
+    Like extract_statement, but yield the result in DataFrames of at most
+    chunksize rows. This is the engine behind every chunked statement iterator.
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file, or an open sqlite3 connection
+        spec (object): the StatementSpec to extract
+        subject_id (string or iterable): the entity_id(s) to filter by, or None
+            for every entity
+        chunksize (int): the maximum number of rows per DataFrame
+        latest (bool): stream only the latest filing for each reporting period
+        compact (bool): convert each chunk with compact_dtypes
+
+    Yields:
+        DataFrame (object): Pandas DataFrames of consecutive rows of the statement
+    '''
+    with open_database(db_file) as conn:
+        sql_query = compile_statement(conn, spec, latest)
+        yield from iter_entities(conn, sql_query, subject_id, chunksize, compact)
+
+
+# Run several getters for the same entities together
+def read_statements(db_file, getters, subject_id, latest=False, max_workers=None, compact=False):
+    '''
+    Run several statement getters for the same entities on one connection inside
+    one read transaction, so all statements come from the same database snapshot
+    and the connection overhead is paid once.
+
+    With max_workers, the getters instead run concurrently on a thread pool, each
+    thread with its own connection and read transaction. That only makes sense for
+    unchanging files such as the PUDL downloads, and needs db_file to be a path.
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file, or an open sqlite3 connection
+        getters (dict): the getter functions by statement name
+        subject_id (string or iterable): the entity_id(s) to filter by, or None
+            for every entity
+        latest (bool): return only the latest filing for each reporting period
+        max_workers (int): run the getters on this many threads, or None to run
+            them one after the other
+        compact (bool): convert the results with compact_dtypes
+
+    Returns:
+        dict: a Pandas DataFrame per statement name
+    '''
+    # Every getter reads the ids, so a one-shot iterator must not be used up by the first
+    if subject_id is not None:
+        subject_id = as_entity_ids(subject_id)
+
+    if max_workers and not isinstance(db_file, sqlite3.Connection):
+        def read_one(getter):
+            return read_statements(db_file, {None: getter}, subject_id, latest, compact=compact)[None]
+
+        with ThreadPoolExecutor(max_workers) as executor:
+            return dict(zip(getters, executor.map(read_one, getters.values())))
+
+    with open_database(db_file) as conn:
+        owns_transaction = not conn.in_transaction
+        if owns_transaction:
+            conn.execute('BEGIN')
+        try:
+            return {
+                name: getter(conn, subject_id, latest, compact) for name, getter in getters.items()
+            }
+        finally:
+            # Nothing was written, so rolling back just ends the read transaction
+            if owns_transaction:
+                conn.rollback()
+
+
+# Keep connections open between getter calls
+class FercReader:
+    '''
+    Base class for the Form 2 and Form 6 readers. A reader keeps one sqlite3
+    connection open per thread, so repeated getter calls reuse SQLite's page
+    cache and parsed schema instead of reconnecting every time.
+
+    Use it as a context manager, or call close() when done:
+
+        with Ferc6Reader('ferc6_xbrl.sqlite') as reader:
+            df = reader.get_income_statement('C001041')
+
+    Parameters:
+        db_file (object): Path to a PUDL sqlite database file
+        read_only (bool): open the connections in the read-only mode of
+            set_read_only_mode, or None to follow the module setting
+    '''
+
+    def __init__(self, db_file, read_only=None):
+        self.db_file = db_file
+        self.read_only = read_only
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self):
+        '''The sqlite3 connection owned by the calling thread, opened on first use.'''
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # close() may run on another thread than the one that opened the connection
+            conn = connect(self.db_file, self.read_only, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        '''Close the connections opened by every thread.'''
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
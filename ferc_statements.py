@@ -0,0 +1,609 @@
+'''
+This file contains the registry of FERC Form 2 and Form 6 statements. Each
+statement is declared once as a StatementSpec: its form, sqlite table, period
+type and ordered columns. The extraction engine in ferc_sqlite compiles a spec
+into a projected SELECT, and the getters of the extract modules are thin
+wrappers around it.
+
+A new schedule is added with one register_statement call below; ferc_forms then
+builds its getter and chunked iterator, with the result cache, metrics, latest
+filing and compact dtype options of every other statement.
+
+The registry only uses the standard library, so forms, statements and tables can
+be listed without importing pandas.
+'''
+
+from collections import namedtuple
+
+
+# One statement: period_type is 'duration' or 'instant'
+StatementSpec = namedtuple('StatementSpec', ['form', 'name', 'table', 'period_type', 'columns'])
+
+
+# Columns that identify a filing, present in every statement
+FILING_COLUMNS = ('entity_id', 'filing_name', 'publication_time')
+
+# Columns that identify the reporting period, by period type
+PERIOD_COLUMNS = {
+    'duration': ('start_date', 'end_date'),
+    'instant': ('date',),
+}
+
+
+# Registered statements by form name, then statement name, in registration order
+STATEMENT_SPECS = {}
+
+
+# Add a statement to the registry
+def register_statement(form, name, table, period_type, columns):
+    '''
+    Register a statement so the extraction engine and the form lookups know it.
+
+    Parameters:
+        form (string): the form name, e.g. 'ferc6'
+        name (string): the statement name, e.g. 'income_statement'
+        table (string): the PUDL sqlite table the statement is read from
+        period_type (string): 'duration' for start_date/end_date tables,
+            'instant' for date tables
+        columns (iterable): the columns to return, in statement order
+
+    Returns:
+        StatementSpec (object): the registered statement
+
+    Raises:
+        ValueError: if the statement is already registered, the period type is
+            unknown, a column is repeated, or a filing or period column is missing
+    '''
+    columns = tuple(columns)
+    if name in STATEMENT_SPECS.get(form, {}):
+        raise ValueError(f'{form} statement {name!r} is already registered')
+    if period_type not in PERIOD_COLUMNS:
+        raise ValueError(
+            f'Unknown period type {period_type!r}, expected one of {sorted(PERIOD_COLUMNS)}'
+        )
+
+    repeated = sorted({column for column in columns if columns.count(column) > 1})
+    if repeated:
+        raise ValueError(f'{form} statement {name!r} repeats columns: {repeated}')
+    required = FILING_COLUMNS + PERIOD_COLUMNS[period_type]
+    missing = [column for column in required if column not in columns]
+    if missing:
+        raise ValueError(f'{form} statement {name!r} is missing columns: {missing}')
+
+    spec = StatementSpec(form, name, table, period_type, columns)
+    STATEMENT_SPECS.setdefault(form, {})[name] = spec
+    return spec
+
+
+# Look up one registered statement
+def get_statement_spec(form, statement):
+    '''
+    Return the StatementSpec of a statement of a FERC form.
+
+    Parameters:
+        form (string): the form name, 'ferc2' or 'ferc6'
+        statement (string): the statement name, e.g. 'income_statement'
+
+    Returns:
+        StatementSpec (object): the registered statement
+
+    Raises:
+        KeyError: if the form or statement is unknown
+    '''
+    if form not in STATEMENT_SPECS:
+        raise KeyError(f'Unknown form {form!r}, expected one of {sorted(STATEMENT_SPECS)}')
+    if statement not in STATEMENT_SPECS[form]:
+        raise KeyError(
+            f'Unknown {form} statement {statement!r}, expected one of {sorted(STATEMENT_SPECS[form])}'
+        )
+
+    return STATEMENT_SPECS[form][statement]
+
+
+# Tables read by the statements of one form
+def form_tables(form):
+    '''
+    Return the distinct tables of a form's registered statements, in
+    registration order.
+
+    Parameters:
+        form (string): the form name, 'ferc2' or 'ferc6'
+
+    Returns:
+        tuple: the table names
+    '''
+    return tuple(dict.fromkeys(spec.table for spec in STATEMENT_SPECS[form].values()))
+
+
+# FERC Form 2 statements
+
+# Statement of Income
+register_statement(
+    'ferc2', 'statement_of_income', 'statement_of_income_114_duration', 'duration',
+    (
+        'entity_id',
+        'filing_name',
+        'publication_time',
+        'utility_type_axis',
+        'start_date',
+        'end_date',
+        'operating_revenues',
+        'operation_expense',
+        'maintenance_expense',
+        'depreciation_expense',
+        'depreciation_expense_for_asset_retirement_costs',
+        'amortization_and_depletion_of_utility_plant',
+        'amortization_of_gas_plant_acquisition_adjustments',
+        'amortization_of_property_losses_unrecovered_plant_and_regulatory_study_costs',
+        'amortization_of_conversion_expenses',
+        'regulatory_debits',
+        'regulatory_credits',
+        'taxes_other_than_income_taxes_utility_operating_income',
+        'income_taxes_utility_operating_income',
+        'income_taxes_utility_operating_income_other',
+        'provisions_for_deferred_income_taxes_utility_operating_income',
+        'provision_for_deferred_income_taxes_credit_utility_operating_income',
+        'investment_tax_credit_adjustments',
+        'gains_from_disposition_of_plant',
+        'losses_from_disposition_of_utility_plant',
+        'gains_from_disposition_of_allowances',
+        'losses_from_disposition_of_allowances',
+        'accretion_expense',
+        'utility_operating_expenses',
+        'net_utility_operating_income',
+        'revenues_from_merchandising_jobbing_and_contract_work',
+        'costs_and_expenses_of_merchandising_jobbing_and_contract_work',
+        'revenues_from_nonutility_operations',
+        'expenses_of_nonutility_operations',
+        'nonoperating_rental_income',
+        'equity_in_earnings_of_subsidiary_companies',
+        'interest_and_dividend_income',
+        'allowance_for_other_funds_used_during_construction',
+        'miscellaneous_nonoperating_income',
+        'gain_on_disposition_of_property',
+        'other_income',
+        'loss_on_disposition_of_property',
+        'miscellaneous_amortization',
+        'donations',
+        'life_insurance',
+        'penalties',
+        'expenditures_for_certain_civic_political_and_related_activities',
+        'other_deductions',
+        'other_income_deductions',
+        'taxes_other_than_income_taxes_other_income_and_deductions',
+        'income_taxes_federal',
+        'income_taxes_other',
+        'provision_for_deferred_income_taxes_other_income_and_deductions',
+        'provision_for_deferred_income_taxes_credit_other_income_and_deductions',
+        'investment_tax_credit_adjustments_nonutility_operations',
+        'investment_tax_credits',
+        'taxes_on_other_income_and_deductions',
+        'net_other_income_and_deductions',
+        'interest_on_long_term_debt',
+        'amortization_of_debt_discount_and_expense',
+        'amortization_of_loss_on_reacquired_debt',
+        'amortization_of_premium_on_debt_credit',
+        'amortization_of_gain_on_reacquired_debt_credit',
+        'interest_on_debt_to_associated_companies',
+        'other_interest_expense',
+        'allowance_for_borrowed_funds_used_during_construction_credit',
+        'net_interest_charges',
+        'income_before_extraordinary_items',
+        'extraordinary_income',
+        'extraordinary_deductions',
+        'net_extraordinary_items',
+        'income_taxes_extraordinary_items',
+        'extraordinary_items_after_taxes',
+        'net_income_loss',
+    ),
+)
+
+
+# Balance Sheet assets and other debits
+register_statement(
+    'ferc2', 'balance_sheet_assets',
+    'comparative_balance_sheet_assets_and_other_debits_110_instant', 'instant',
+    (
+        'entity_id',
+        'filing_name',
+        'publication_time',
+        'date',
+        'other_special_funds',
+        'advances_for_gas',
+        'accounts_receivable_from_associated_companies',
+        'accumulated_provision_for_uncollectible_accounts_credit',
+        'unamortized_loss_on_reacquired_debt',
+        'extraordinary_property_losses',
+        'other_property_and_investments',
+        'prepayments',
+        'utility_plant_and_construction_work_in_progress',
+        'nonutility_property',
+        'research_development_and_demonstration_expenditures',
+        'preliminary_natural_gas_survey_and_investigation_charges_and_other_preliminary_survey_and_investigation_charges',
+        'assets_and_other_debits',
+        'unrecovered_purchased_gas_costs',
+        'temporary_cash_investments',
+        'other_materials_and_supplies',
+        'clearing_accounts',
+        'other_investments',
+        'amortization_fund_federal',
+        'accumulated_provision_for_depreciation_and_amortization_of_nonutility_property',
+        'utility_plant',
+        'sinking_funds',
+        'gas_owed_to_system_gas',
+        'nuclear_materials_held_for_sale',
+        'notes_receivable',
+        'system_balancing_gas',
+        'gas_stored_in_reservoirs_and_pipelines_noncurrent',
+        'other_gas_plant_adjustments',
+        'customer_accounts_receivable',
+        'derivative_instrument_assets',
+        'interest_and_dividends_receivable',
+        'accumulated_deferred_income_taxes',
+        'deferred_losses_from_disposition_of_utility_plant',
+        'investment_in_associated_companies',
+        'liquefied_natural_gas_stored_and_held_for_processing',
+        'utility_plant_net',
+        'other_accounts_receivable',
+        'nuclear_fuel',
+        'investment_in_subsidiary_companies',
+        'fuel_stock',
+        'residuals_and_extracted_products',
+        'accumulated_provision_for_depreciation_amortization_and_depletion_of_plant_utility',
+        'merchandise',
+        'utility_plant_and_nuclear_fuel_net',
+        'miscellaneous_deferred_debits',
+        'construction_work_in_progress',
+        'gas_stored_base_gas',
+        'derivative_instrument_assets_hedges_long_term',
+        'depreciation_fund',
+        'working_funds',
+        'accrued_utility_revenues',
+        'derivative_instrument_assets_hedges',
+        'temporary_facilities',
+        'special_deposits',
+        'other_regulatory_assets',
+        'stores_expense_undistributed',
+        'fuel_stock_expenses_undistributed',
+        'accumulated_provision_for_amortization_of_nuclear_fuel_assemblies',
+        'current_and_accrued_assets',
+        'nuclear_fuel_net',
+        'deferred_debits',
+        'allowance_inventory_and_withheld',
+        'plant_materials_and_operating_supplies',
+        'preliminary_survey_and_investigation_charges',
+        'gas_stored_current',
+        'rents_receivable',
+        'unamortized_debt_expense',
+        'noncurrent_portion_of_allowances',
+        'miscellaneous_current_and_accrued_assets',
+        'unrecovered_plant_and_regulatory_study_costs',
+        'cash',
+        'derivative_instrument_assets_long_term',
+        'notes_receivable_from_associated_companies',
+    ),
+)
+
+
+# Balance Sheet liabilities and other credits
+register_statement(
+    'ferc2', 'balance_sheet_liabilities_and_equity',
+    'comparative_balance_sheet_liabilities_and_other_credits_110_instant', 'instant',
+    (
+        'entity_id',
+        'filing_name',
+        'publication_time',
+        'date',
+        'notes_payable_to_associated_companies',
+        'advances_from_associated_companies',
+        'accumulated_provision_for_pensions_and_benefits',
+        'accumulated_provision_for_property_insurance',
+        'other_deferred_credits',
+        'accounts_payable',
+        'unappropriated_undistributed_subsidiary_earnings',
+        'discount_on_capital_stock',
+        'premium_on_capital_stock',
+        'obligations_under_capital_lease_noncurrent',
+        'dividends_declared',
+        'customer_advances_for_construction',
+        'unamortized_premium_on_long_term_debt',
+        'other_long_term_debt',
+        'current_portion_of_long_term_debt',
+        'other_paid_in_capital',
+        'proprietary_capital',
+        'obligations_under_capital_leases_current',
+        'long_term_portion_of_derivative_instrument_liabilities_hedges',
+        'reacquired_bonds',
+        'accumulated_provision_for_rate_refunds',
+        'miscellaneous_current_and_accrued_liabilities',
+        'long_term_debt',
+        'accounts_payable_to_associated_companies',
+        'long_term_portion_of_derivative_instrument_liabilities',
+        'accumulated_deferred_income_taxes_accelerated_amortization_property',
+        'retained_earnings',
+        'unamortized_gain_on_reacquired_debt',
+        'accumulated_deferred_income_taxes_other_property',
+        'matured_long_term_debt',
+        'other_regulatory_liabilities',
+        'preferred_stock_issued',
+        'bonds',
+        'common_stock_issued',
+        'stock_liability_for_conversion',
+        'accumulated_provision_for_injuries_and_damages',
+        'customer_deposits',
+        'accumulated_deferred_income_taxes_other',
+        'deferred_gains_from_disposition_of_utility_plant',
+        'deferred_credits',
+        'current_and_accrued_liabilities',
+        'accumulated_other_comprehensive_income',
+        'taxes_accrued',
+        'other_noncurrent_liabilities',
+        'derivative_instrument_liabilities_hedges',
+        'notes_payable',
+        'reacquired_capital_stock',
+        'matured_interest',
+        'derivatives_instrument_liabilities',
+        'capital_stock_expense',
+        'capital_stock_subscribed',
+        'liabilities_and_other_credits',
+        'installments_received_on_capital_stock',
+        'accumulated_miscellaneous_operating_provisions',
+        'accumulated_deferred_investment_tax_credits',
+        'interest_accrued',
+        'asset_retirement_obligations',
+        'unamortized_discount_on_long_term_debt_debit',
+        'tax_collections_payable',
+    ),
+)
+
+
+# Statement of Cash Flows
+register_statement(
+    'ferc2', 'statement_of_cash_flows', 'statement_of_cash_flows_120_duration', 'duration',
+    (
+        'entity_id',
+        'filing_name',
+        'publication_time',
+        'start_date',
+        'end_date',
+        'gross_additions_to_nonutility_plant_investing_activities',
+        'net_increase_decrease_in_inventory_investing_activities',
+        'gross_additions_to_nuclear_fuel_investing_activities',
+        'proceeds_from_sales_of_investment_securities',
+        'other_adjustments_to_cash_flows_from_investment_activities',
+        'net_increase_decrease_in_payables_and_accrued_expenses_operating_activities',
+        'net_increase_decrease_in_other_regulatory_assets_operating_activities',
+        'disposition_of_investments_in_and_advances_to_associated_and_subsidiary_companies',
+        'net_increase_in_short_term_debt',
+        'proceeds_from_issuance_of_preferred_stock_financing_activities',
+        'gross_additions_to_utility_plant_less_nuclear_fuel_investing_activities',
+        'net_decrease_in_short_term_debt',
+        'other_adjustments_to_cash_flows_from_financing_activities',
+        'investment_tax_credit_adjustments_net',
+        'dividends_on_preferred_stock',
+        'payments_for_retirement_of_long_term_debt_financing_activities',
+        'net_increase_decrease_in_other_regulatory_liabilities_operating_activities',
+        'deferred_income_taxes_net',
+        'noncash_adjustments_to_cash_flows_from_operating_activities',
+        'net_increase_decrease_in_allowances_inventory_operating_activities',
+        'cash_outflows_for_plant',
+        'payments_for_retirement_of_common_stock_financing_activities',
+        'net_increase_decrease_in_allowances_held_for_speculation_investing_activities',
+        'payments_for_retirement_of_preferred_stock_financing_activities',
+        'undistributed_earnings_from_subsidiary_companies_operating_activities',
+        'net_increase_decrease_in_receivables_investing_activities',
+        'net_increase_decrease_in_inventory_operating_activities',
+        'proceeds_from_disposal_of_noncurrent_assets',
+        'net_increase_decrease_in_payables_and_accrued_expenses_investing_activities',
+        'other_adjustments_to_cash_flows_from_operating_activities',
+        'net_increase_decrease_in_receivables_operating_activities',
+        'cash_flows_provided_from_used_in_investment_activities',
+        'proceeds_from_issuance_of_common_stock_financing_activities',
+        'cash_provided_by_outside_sources',
+        'allowance_for_other_funds_used_during_construction_investing_activities',
+        'allowance_for_other_funds_used_during_construction_operating_activities',
+        'net_increase_decrease_in_cash_and_cash_equivalents',
+        'proceeds_from_issuance_of_long_term_debt_financing_activities',
+        'other_construction_and_acquisition_of_plant_investment_activities',
+        'other_adjustments_by_outside_sources_to_cash_flows_from_financing_activities',
+        'contributions_and_advances_from_associated_and_subsidiary_companies',
+        'net_income_loss',
+        'other_retirements_of_balances_impacting_cash_flows_from_financing_activities',
+        'loans_made_or_purchased',
+        'cash_flows_provided_from_used_in_financing_activities',
+        'gross_additions_to_common_utility_plant_investing_activities',
+        'net_cash_provided_by_used_in_operating_activities',
+        'dividends_on_common_stock',
+        'acquisition_of_other_noncurrent_assets',
+        'collections_on_loans',
+        'depreciation_and_depletion',
+        'purchase_of_investment_securities',
+        'investments_in_and_advances_to_associated_and_subsidiary_companies',
+    ),
+)
+
+
+# FERC Form 6 statements
+
+# Income Statement
+register_statement(
+    'ferc6', 'income_statement', 'income_statement_114_duration', 'duration',
+    (
+        'entity_id',
+        'filing_name',
+        'publication_time',
+        'start_date',
+        'end_date',
+        'operating_revenues',
+        'operating_expenses',
+        'net_carrier_operating_income',
+        'other_income_and_deductions',
+        'income_net_from_noncarrier_property',
+        'interest_and_dividend_income',
+        'miscellaneous_income',
+        'unusual_or_infrequent_items_credit',
+        'interest_expense',
+        'miscellaneous_income_charges',
+        'unusual_or_infrequent_items_debit',
+        'dividend_income_equity_investments',
+        'undistributed_earnings_losses',
+        'equity_in_earnings_losses_of_affiliated_companies_including_dividend_income',
+        'ordinary_income_before_federal_income_taxes',
+        'federal_income_taxes_on_income_from_continuing_operations',
+        'provision_for_deferred_taxes',
+        'income_loss_from_continuing_operations',
+        'income_loss_from_operations_of_discontinued_segments_less_applicable_income_taxes',
+        'gain_loss_from_disposition_of_discontinued_segments_less_applicable_income_taxes',
+        'income_loss_from_discontinued_operations',
+        'income_loss_before_extraordinary_items',
+        'extraordinary_items_net',
+        'income_taxes_on_extraordinary_items',
+        'provision_for_deferred_taxes_extraordinary_items',
+        'extraordinary_items',
+        'cumulative_effect_of_changes_in_accounting_principles_less_applicable_income_taxes',
+        'extraordinary_items_and_accounting_changes',
+        'net_income_loss',
+    ),
+)
+
+
+# Balance Sheet
+register_statement(
+    'ferc6', 'balance_sheet', 'comparative_balance_sheet_110_instant', 'instant',
+    (
+        'entity_id',
+        'filing_name',
+        'publication_time',
+        'date',
+        'cash',
+        'special_deposits',
+        'temporary_investments',
+        'notes_receivable',
+        'receivables_from_affiliated_companies',
+        'accounts_receivable',
+        'accumulated_provision_for_uncollectible_accounts',
+        'interest_and_dividends_receivable',
+        'oil_inventory',
+        'material_and_supplies',
+        'prepayments',
+        'other_current_assets',
+        'deferred_income_tax_assets',
+        'current_assets',
+        'investments_in_affiliated_companies_stocks',
+        'investment_in_affiliated_companies_bonds',
+        'investments_in_affiliated_companies_other_secured_obligations',
+        'investments_in_affiliated_companies_unsecured_notes',
+        'investments_in_affiliated_companies_investment_advances',
+        'investments_in_affiliated_companies_undistributed_earnings_from_certain_investments',
+        'other_investments_stocks',
+        'other_investments_bonds',
+        'other_investments_other_secured_obligations',
+        'other_investments_unsecured_notes',
+        'other_investments_investment_advances',
+        'sinking_and_other_funds',
+        'investments_and_special_funds',
+        'carrier_property',
+        'accrued_depreciation_carrier_property',
+        'accrued_amortization_carrier_property',
+        'carrier_property_net',
+        'operating_oil_supply',
+        'noncarrier_property',
+        'accrued_depreciation_noncarrier_property',
+        'noncarrier_property_net',
+        'tangible_property',
+        'organization_costs_and_other_intangibles',
+        'accrued_amortization_of_intangibles',
+        'miscellaneous_other_assets',
+        'other_deferred_charges',
+        'accumulated_deferred_income_tax_assets',
+        'derivative_instrument_assets',
+        'derivative_instrument_assets_hedges',
+        'other_assets_and_deferred_charges',
+        'assets',
+        'notes_payable',
+        'payables_to_affiliated_companies',
+        'accounts_payable',
+        'salaries_and_wages_payable',
+        'interest_payable',
+        'dividends_payable',
+        'taxes_payable',
+        'long_term_debt_payable_within_one_year',
+        'other_current_liabilities',
+        'deferred_income_tax_liabilities',
+        'current_liabilities',
+        'long_term_debt_payable_after_one_year',
+        'unamortized_premium_on_long_term_debt',
+        'unamortized_discount_on_long_term_debt_debit',
+        'other_noncurrent_liabilities',
+        'accumulated_deferred_income_tax_liabilities',
+        'derivative_instrument_liabilities',
+        'derivative_instrument_liabilities_hedges',
+        'asset_retirement_obligations',
+        'noncurrent_liabilities',
+        'liabilities',
+        'capital_stock',
+        'premiums_on_capital_stock',
+        'capital_stock_subscriptions',
+        'additional_paid_in_capital',
+        'appropriated_retained_income',
+        'unappropriated_retained_income_and_equity_in_undistributed_earnings_losses_of_affiliated_company',
+        'treasury_stock',
+        'accumulated_other_comprehensive_income',
+        'stockholders_equity',
+        'liabilities_and_stockholders_equity',
+    ),
+)
+
+
+# Cash Flow Statement
+register_statement(
+    'ferc6', 'cash_flow_statement', 'statement_of_cash_flows_120_duration', 'duration',
+    (
+        'entity_id',
+        'filing_name',
+        'publication_time',
+        'start_date',
+        'end_date',
+        'net_income_loss',
+        'depreciation_and_depletion',
+        'amortization',
+        'noncash_adjustments_to_cash_flows_from_operating_activities',
+        'deferred_income_taxes_net',
+        'net_increase_decrease_in_receivables_operating_activities',
+        'net_increase_decrease_in_inventory_operating_activities',
+        'net_increase_decrease_in_payables_and_accrued_expenses_operating_activities',
+        'other_adjustments_to_cash_flows_from_operating_activities',
+        'net_cash_provided_by_used_in_operating_activities',
+        'gross_additions_to_carrier_property_investment_activities',
+        'gross_additions_to_noncarrier_property_investment_activities',
+        'other_construction_and_acquisition_of_plant_investment_activities',
+        'cash_outflows_for_plant',
+        'acquisition_of_other_noncurrent_assets',
+        'proceeds_from_disposal_of_noncurrent_assets',
+        'investments_in_and_advances_to_associated_and_subsidiary_companies',
+        'contributions_and_advances_from_associated_and_subsidiary_companies',
+        'disposition_of_investments_in_and_advances_to_associated_and_subsidiary_companies',
+        'purchase_of_investment_securities',
+        'proceeds_from_sales_of_investment_securities',
+        'loans_made_or_purchased',
+        'collections_on_loans',
+        'net_increase_decrease_in_receivables_investing_activities',
+        'net_increase_decrease_in_inventory_investing_activities',
+        'net_increase_decrease_in_payables_and_accrued_expenses_investing_activities',
+        'other_adjustments_to_cash_flows_from_investment_activities',
+        'cash_flows_provided_from_used_in_investment_activities',
+        'proceeds_from_issuance_of_long_term_debt_financing_activities',
+        'proceeds_from_issuance_of_capital_stock',
+        'other_adjustments_by_outside_sources_to_cash_flows_from_financing_activities',
+        'other_adjustment_by_short_term_debt_to_cash_flows_from_financing_activities',
+        'cash_provided_by_outside_sources',
+        'payments_for_retirement_of_long_term_debt_financing_activities',
+        'payment_for_retirement_of_capital_stock',
+        'other_retirements_of_balances_impacting_cash_flows_from_financing_activities',
+        'net_decrease_in_short_term_debt',
+        'dividends_on_capital_stock',
+        'other_adjustments_to_cash_flows_from_financing_activities',
+        'cash_flows_provided_from_used_in_financing_activities',
+        'net_increase_decrease_in_cash_and_cash_equivalents',
+    ),
+)
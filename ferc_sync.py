@@ -0,0 +1,201 @@
+'''
+This file contains an incremental sync of FERC Form 2 and Form 6 statements from
+PUDL sqlite releases into the Parquet store of ferc_parquet.
+
+For every statement the sync remembers the set of filings it has copied, keyed by
+(entity_id, filing_name, publication_time), and the high-water mark of
+publication_time. On a new release it lists the filing keys of each table and
+reads only the rows of filings it has not seen, selected inside SQLite by the
+high-water mark and the keys of late amendments, in the statement's column
+layout, and adds them to the store. The state is kept in
+<store_dir>/_sync_state.json, so a nightly refresh scales with the number of new
+or amended filings rather than the size of the database.
+
+New Parquet files are first written under a name that dataset readers skip, and
+listed in the state as pending. They are renamed into place only after the state
+with their filings is saved, and a sync that was interrupted in between finishes
+or discards them on the next run, so filings are never added twice.
+'''
+
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+
+from ferc_forms import FORMS
+from ferc_parquet import statement_directory, write_statement_frame
+from ferc_sqlite import compile_statement, connect_read_only, read_entities
+from ferc_statements import get_statement_spec
+
+
+# The columns that identify one filing
+FILING_KEY = ('entity_id', 'filing_name', 'publication_time')
+
+STATE_FILE = '_sync_state.json'
+
+# Prefix of Parquet files not yet recorded as synced; pyarrow datasets skip names starting with '_'
+PENDING_PREFIX = '_pending-'
+
+
+# Read and write the sync state
+def load_sync_state(store_dir):
+    '''
+    Return the sync state of a store: {'<form>/<statement>': {'high_water_mark':
+    ..., 'filings': [[entity_id, filing_name, publication_time], ...]}}. While
+    a sync is publishing its files, the statement also lists their 'pending_files'.
+    '''
+    path = Path(store_dir) / STATE_FILE
+    if not path.exists():
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+
+def _save_sync_state(store_dir, state):
+    path = Path(store_dir) / STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix('.tmp')
+    with open(temp_path, 'w') as file:
+        json.dump(state, file)
+    os.replace(temp_path, path)
+
+
+# Read the rows of new filings
+def _read_new_filings(conn, spec, new_filings, high_water_mark):
+    '''
+    Read the rows of the given filings of a statement. Filings published after
+    the high-water mark are selected by publication_time; only the remaining
+    ones, amendments published with an earlier time, are bound as explicit keys.
+    With no high-water mark, the whole table is read.
+    '''
+    sql_query = compile_statement(conn, spec)
+    if high_water_mark is None and not new_filings:
+        return read_entities(conn, sql_query, None)
+
+    conditions = []
+    params = []
+    if high_water_mark is not None:
+        conditions.append('publication_time > ?')
+        params.append(high_water_mark)
+    older_filings = [
+        filing for filing in new_filings
+        if high_water_mark is None or filing[2] is None or filing[2] <= high_water_mark
+    ]
+    if older_filings:
+        conditions.append(
+            '(entity_id, filing_name, publication_time) IN ('
+            "SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), "
+            "json_extract(value, '$[2]') FROM json_each(?))"
+        )
+        params.append(json.dumps(sorted(older_filings, key=lambda f: tuple(v or '' for v in f))))
+
+    sql_query += ' WHERE (' + ' OR '.join(conditions) + ')'
+    return read_entities(conn, sql_query, None, params=params)
+
+
+# Move written files into the dataset
+def _publish_files(store_dir, pending_files):
+    for pending_file in pending_files:
+        path = Path(store_dir) / pending_file
+        if path.exists():
+            os.replace(path, path.with_name(path.name[len(PENDING_PREFIX):]))
+
+
+# Finish or discard the files of an interrupted sync
+def _recover_pending(store_dir, form, statements, state):
+    for statement in statements:
+        statement_state = state.get(f'{form}/{statement}', {})
+        if statement_state.get('pending_files'):
+            # The state already counts these filings, so the files belong in the store
+            _publish_files(store_dir, statement_state.pop('pending_files'))
+            _save_sync_state(store_dir, state)
+
+        # Files whose filings never made it into the state are copied again
+        for path in statement_directory(store_dir, form, statement).rglob(f'{PENDING_PREFIX}*'):
+            path.unlink()
+
+
+# Copy new filings into the store
+def sync_statements(db_file, form, store_dir, statements=None):
+    '''
+    Add the filings of a PUDL FERC sqlite release that are not yet in a Parquet
+    store. The first sync of a statement copies every filing.
+
+    Parameters:
+        db_file (object): Path to the PUDL FERC sqlite database file of the release
+        form (string): the form name, 'ferc2' or 'ferc6'
+        store_dir (object): Path to the root directory of the Parquet store
+        statements (iterable): the statement names to sync. Defaults to all
+            statements of the form
+
+    Returns:
+        dict: per statement, the number of new filings and rows copied, the number
+            of known filings missing from the release, and the high-water mark
+    '''
+    if statements is None:
+        statements = FORMS[form]
+
+    statements = list(statements)
+    state = load_sync_state(store_dir)
+    _recover_pending(store_dir, form, statements, state)
+    # Unique per run, since a file with the same name would be overwritten
+    basename = f'sync-{time.strftime("%Y%m%dT%H%M%S")}-{uuid.uuid4().hex[:12]}'
+    summary = {}
+
+    conn = connect_read_only(db_file)
+    try:
+        for statement in statements:
+            spec = get_statement_spec(form, statement)
+            sql_table = spec.table
+            statement_state = state.get(f'{form}/{statement}', {'high_water_mark': None, 'filings': []})
+
+            # Listing the filing keys reads three columns, not the whole statement
+            release_filings = set(conn.execute(
+                f'SELECT DISTINCT entity_id, filing_name, publication_time FROM {sql_table}'
+            ))
+            known_filings = {tuple(filing) for filing in statement_state['filings']}
+            new_filings = release_filings - known_filings
+
+            rows = 0
+            pending_files = []
+            if new_filings:
+                # The first sync copies the whole table
+                df = _read_new_filings(
+                    conn, spec, new_filings if known_filings else (),
+                    statement_state['high_water_mark'] if known_filings else None,
+                )
+                rows = write_statement_frame(
+                    df, store_dir, form, statement,
+                    replace=not known_filings, basename=PENDING_PREFIX + basename,
+                )
+                statement_dir = statement_directory(store_dir, form, statement)
+                pending_files = sorted(
+                    str(path.relative_to(store_dir))
+                    for path in statement_dir.rglob(f'{PENDING_PREFIX}{basename}-*')
+                )
+
+            publication_times = [filing[2] for filing in release_filings if filing[2] is not None]
+            high_water_mark = max(
+                publication_times + [statement_state['high_water_mark'] or ''], default=None
+            ) or None
+            state[f'{form}/{statement}'] = {
+                'high_water_mark': high_water_mark,
+                'filings': sorted(known_filings | new_filings, key=lambda f: tuple(v or '' for v in f)),
+                'pending_files': pending_files,
+            }
+            summary[statement] = {
+                'new_filings': len(new_filings),
+                'rows': rows,
+                'missing_filings': len(known_filings - release_filings),
+                'high_water_mark': high_water_mark,
+            }
+
+            # Record the filings before their files become visible, then publish the files
+            _save_sync_state(store_dir, state)
+            _publish_files(store_dir, state[f'{form}/{statement}'].pop('pending_files'))
+            _save_sync_state(store_dir, state)
+    finally:
+        conn.close()
+
+    return summary
@@ -0,0 +1,192 @@
+'''
+This file contains a validation engine that checks FERC Form 2 and Form 6 filings
+against the accounting identities of their statements.
+
+Each identity is declared as a total line item and the signed line items that
+should add up to it. validate_filings loads each statement table once and
+evaluates all of its identities as vectorized column expressions over every
+filing, returning one compact report of the rows that break an identity.
+'''
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from ferc_forms import get_statement_getter
+
+
+# total == sum of terms; a term starting with '-' is subtracted
+Identity = namedtuple('Identity', ['name', 'form', 'statement', 'total', 'terms'])
+
+
+# The identities checked by default
+IDENTITIES = (
+    # Form 6 Balance Sheet
+    Identity(
+        'ferc6_balance_sheet_balances', 'ferc6', 'balance_sheet',
+        'assets', ('liabilities_and_stockholders_equity',),
+    ),
+    Identity(
+        'ferc6_liabilities_and_stockholders_equity', 'ferc6', 'balance_sheet',
+        'liabilities_and_stockholders_equity', ('liabilities', 'stockholders_equity'),
+    ),
+    Identity(
+        'ferc6_liabilities', 'ferc6', 'balance_sheet',
+        'liabilities', ('current_liabilities', 'noncurrent_liabilities'),
+    ),
+    Identity(
+        'ferc6_carrier_property_net', 'ferc6', 'balance_sheet',
+        'carrier_property_net',
+        (
+            'carrier_property',
+            '-accrued_depreciation_carrier_property',
+            '-accrued_amortization_carrier_property',
+        ),
+    ),
+    # Form 6 Income Statement
+    Identity(
+        'ferc6_net_carrier_operating_income', 'ferc6', 'income_statement',
+        'net_carrier_operating_income', ('operating_revenues', '-operating_expenses'),
+    ),
+    # Form 6 Cash Flow Statement
+    Identity(
+        'ferc6_net_change_in_cash', 'ferc6', 'cash_flow_statement',
+        'net_increase_decrease_in_cash_and_cash_equivalents',
+        (
+            'net_cash_provided_by_used_in_operating_activities',
+            'cash_flows_provided_from_used_in_investment_activities',
+            'cash_flows_provided_from_used_in_financing_activities',
+        ),
+    ),
+    # Form 2 Statement of Income
+    Identity(
+        'ferc2_net_utility_operating_income', 'ferc2', 'statement_of_income',
+        'net_utility_operating_income', ('operating_revenues', '-utility_operating_expenses'),
+    ),
+    Identity(
+        'ferc2_net_extraordinary_items', 'ferc2', 'statement_of_income',
+        'net_extraordinary_items', ('extraordinary_income', '-extraordinary_deductions'),
+    ),
+    Identity(
+        'ferc2_extraordinary_items_after_taxes', 'ferc2', 'statement_of_income',
+        'extraordinary_items_after_taxes',
+        ('net_extraordinary_items', '-income_taxes_extraordinary_items'),
+    ),
+    # Form 2 Statement of Cash Flows
+    Identity(
+        'ferc2_net_change_in_cash', 'ferc2', 'statement_of_cash_flows',
+        'net_increase_decrease_in_cash_and_cash_equivalents',
+        (
+            'net_cash_provided_by_used_in_operating_activities',
+            'cash_flows_provided_from_used_in_investment_activities',
+            'cash_flows_provided_from_used_in_financing_activities',
+        ),
+    ),
+)
+
+
+# Columns copied into the report to identify each failing row
+REPORT_LABELS = (
+    'entity_id', 'filing_name', 'publication_time', 'start_date', 'end_date', 'date',
+    'utility_type_axis',
+)
+
+
+# Evaluate the identities of one statement over a whole table
+def check_identities(df, identities, tolerance=1.0):
+    '''
+    Evaluate identities over every row of a statement DataFrame at once.
+    Missing terms count as zero; rows where the total or every term is missing
+    are skipped.
+
+    Parameters:
+        df (object): A Pandas DataFrame returned by a statement getter
+        identities (iterable): the Identity rules to check
+        tolerance (float): the largest absolute difference still accepted
+
+    Returns:
+        DataFrame (object): one row per failing (filing row, identity) with the
+            identity name, the labels of the filing row, the reported total,
+            the sum of its terms and the difference
+    '''
+    df = df.loc[:, ~df.columns.duplicated()]
+    labels = [column for column in REPORT_LABELS if column in df.columns]
+    reports = []
+
+    for identity in identities:
+        total = df[identity.total].to_numpy(dtype=float, na_value=np.nan)
+        signs = np.array([-1.0 if term.startswith('-') else 1.0 for term in identity.terms])
+        columns = [term.lstrip('-') for term in identity.terms]
+        terms = df[columns].to_numpy(dtype=float, na_value=np.nan)
+
+        expected = np.nansum(terms * signs, axis=1)
+        difference = total - expected
+        checked = ~np.isnan(total) & ~np.isnan(terms).all(axis=1)
+        failing = checked & (np.abs(difference) > tolerance)
+        if not failing.any():
+            continue
+
+        report = df.loc[failing, labels].reset_index(drop=True)
+        report.insert(0, 'identity', identity.name)
+        report['reported'] = total[failing]
+        report['expected'] = expected[failing]
+        report['difference'] = difference[failing]
+        reports.append(report)
+
+    if not reports:
+        return pd.DataFrame(columns=['identity', *labels, 'reported', 'expected', 'difference'])
+
+    return pd.concat(reports, ignore_index=True)
+
+
+# Screen every filing in a release
+def validate_filings(db_files, identities=IDENTITIES, tolerance=1.0, latest=False):
+    '''
+    Check every filing in PUDL FERC sqlite databases against accounting identities.
+    Each statement table is read once, whatever the number of identities on it.
+
+    Parameters:
+        db_files (dict): Path to the PUDL sqlite database file per form,
+            e.g. {'ferc2': 'ferc2_xbrl.sqlite', 'ferc6': 'ferc6_xbrl.sqlite'}.
+            Identities of forms left out are skipped
+        identities (iterable): the Identity rules to check. Defaults to IDENTITIES
+        tolerance (float): the largest absolute difference still accepted
+        latest (bool): check only the latest filing for each reporting period
+
+    Returns:
+        DataFrame (object): the violations; see check_identities
+    '''
+    by_statement = {}
+    for identity in identities:
+        if identity.form in db_files:
+            by_statement.setdefault((identity.form, identity.statement), []).append(identity)
+
+    reports = []
+    for (form, statement), statement_identities in by_statement.items():
+        df = get_statement_getter(form, statement)(db_files[form], None, latest=latest)
+        reports.append(check_identities(df, statement_identities, tolerance))
+
+    reports = [report for report in reports if not report.empty]
+    if not reports:
+        return check_identities(pd.DataFrame(columns=list(REPORT_LABELS)), ())
+
+    return pd.concat(reports, ignore_index=True)
+
+
+# Count the violations per identity
+def summarize_violations(violations):
+    '''
+    Count the failing rows and entities per identity in a validate_filings report.
+
+    Parameters:
+        violations (object): A Pandas DataFrame returned by validate_filings
+
+    Returns:
+        DataFrame (object): rows, entities and the largest absolute difference per identity
+    '''
+    return violations.groupby('identity').agg(
+        rows=('entity_id', 'size'),
+        entities=('entity_id', 'nunique'),
+        max_abs_difference=('difference', lambda difference: difference.abs().max()),
+    )
@@ -0,0 +1,58 @@
+'''
+Tests for the asyncio getters of ferc_async.
+'''
+
+import asyncio
+import threading
+
+import ferc_async
+
+
+class FakeConnection:
+    def __init__(self):
+        self.interrupts = 0
+
+    def interrupt(self):
+        self.interrupts += 1
+
+
+class FakeReader:
+    def __init__(self):
+        self.connection = FakeConnection()
+
+
+# Cancelling interrupts the query of a running call only, never one queued behind it
+def test_cancel_interrupts_only_the_running_call(monkeypatch):
+    reader = FakeReader()
+    monkeypatch.setattr(ferc_async, '_get_reader', lambda db_file: reader)
+    max_concurrency = ferc_async.MAX_CONCURRENCY
+    ferc_async.set_max_concurrency(1)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def getter(conn, subject_id, latest, compact=False):
+        calls.append(subject_id)
+        started.set()
+        release.wait(5)
+        return subject_id
+
+    async def main():
+        running = asyncio.ensure_future(ferc_async._run(getter, 'db', 'running', False, False))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        queued = asyncio.ensure_future(ferc_async._run(getter, 'db', 'queued', False, False))
+        await asyncio.sleep(0)
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert reader.connection.interrupts == 0
+
+        running.cancel()
+        await asyncio.gather(running, return_exceptions=True)
+        assert reader.connection.interrupts == 1
+        release.set()
+
+    try:
+        asyncio.run(main())
+    finally:
+        ferc_async.close()
+        ferc_async.set_max_concurrency(max_concurrency)
+    assert calls == ['running']
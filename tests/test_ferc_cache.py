@@ -0,0 +1,30 @@
+'''
+Tests for the result cache of ferc_cache.
+'''
+
+import os
+
+import pandas as pd
+
+from ferc_cache import StatementCache
+
+
+# The on-disk tier stays within its budget, dropping the least recently used files
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    df = pd.DataFrame({'value': range(1000)})
+    cache = StatementCache(max_bytes=0, disk_dir=tmp_path)
+    cache.put('probe', df)
+    file_size = next(tmp_path.glob('*.pkl')).stat().st_size
+    cache.clear()
+
+    cache = StatementCache(max_bytes=0, disk_dir=tmp_path, max_disk_bytes=3 * file_size)
+    for number, key in enumerate(['old', 'used', 'other']):
+        cache.put(key, df)
+        os.utime(cache._disk_path(key), ns=(number * 10 ** 9, number * 10 ** 9))
+    assert cache.get('used') is not None
+
+    cache.put('new', df)
+
+    assert len(list(tmp_path.glob('*.pkl'))) == 3
+    assert cache.get('old') is None
+    assert all(cache.get(key) is not None for key in ('used', 'other', 'new'))
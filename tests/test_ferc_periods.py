@@ -0,0 +1,24 @@
+'''
+Tests for the period alignment of ferc_periods.
+'''
+
+from ferc_benchmark import make_synthetic_database
+from ferc_periods import align_statements
+
+
+# Every statement sees the entity_ids, years and items of one-shot iterators
+def test_align_statements_with_generator_arguments(tmp_path):
+    db_file = tmp_path / 'ferc6.sqlite'
+    make_synthetic_database(db_file, 'ferc6', n_entities=5, n_years=3, amendment_rate=0)
+    entity_ids = ['C000001', 'C000002']
+    items = ['operating_revenues', 'assets']
+
+    expected = align_statements(db_file, 'ferc6', subject_id=entity_ids, items=items)
+    aligned = align_statements(
+        db_file, 'ferc6', subject_id=(i for i in entity_ids), items=iter(items),
+        years=(year for year in range(2019, 2022)),
+    )
+
+    assert list(aligned.columns) == items
+    assert aligned.shape == expected.shape == (6, 2)
+    assert aligned.equals(expected)
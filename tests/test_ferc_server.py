@@ -0,0 +1,25 @@
+'''
+Tests for the HTTP service of ferc_server.
+'''
+
+import os
+
+from ferc_server import StatementService
+
+
+# A new release of one form leaves the ETags of the other form and of /forms unchanged
+def test_etag_follows_only_its_own_form(tmp_path):
+    db_files = {form: tmp_path / f'{form}.sqlite' for form in ('ferc2', 'ferc6')}
+    for db_file in db_files.values():
+        db_file.write_bytes(b'')
+        os.utime(db_file, ns=(10 ** 9, 10 ** 9))
+    service = StatementService({form: str(db_file) for form, db_file in db_files.items()})
+    paths = ['/form2/statement-of-income/C000001', '/form6/income-statement/C000001', '/forms']
+    before = [service.etag(path, {}, 'json') for path in paths]
+
+    os.utime(db_files['ferc2'], ns=(2 * 10 ** 9, 2 * 10 ** 9))
+    after = [service.etag(path, {}, 'json') for path in paths]
+    service.close()
+
+    assert after[0] != before[0]
+    assert after[1:] == before[1:]
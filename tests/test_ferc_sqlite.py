@@ -0,0 +1,40 @@
+'''
+Tests for the entity filters of ferc_sqlite.
+'''
+
+from ferc6_extracts import Ferc6Reader, get_ferc6_financial_package, iter_ferc6_income_statement
+from ferc_benchmark import make_synthetic_database
+from ferc_sqlite import MAX_SQL_PARAMETERS
+
+
+# Two chunked reads with long entity lists interleaved on one connection
+def test_interleaved_iterators_with_long_entity_lists(tmp_path):
+    db_file = tmp_path / 'ferc6.sqlite'
+    make_synthetic_database(db_file, 'ferc6', n_entities=20, n_years=3, amendment_rate=0)
+    padding = [f'X{i:06d}' for i in range(MAX_SQL_PARAMETERS + 1)]
+    first_ids = padding + [f'C{i:06d}' for i in range(10)]
+    second_ids = padding + [f'C{i:06d}' for i in range(10, 20)]
+
+    with Ferc6Reader(db_file) as reader:
+        first = iter_ferc6_income_statement(reader.connection, first_ids, chunksize=5)
+        first_rows = len(next(first))
+        second = iter_ferc6_income_statement(reader.connection, second_ids, chunksize=5)
+        second_rows = sum(len(df) for df in second)
+        first_rows += sum(len(df) for df in first)
+
+    assert first_rows == 30
+    assert second_rows == 30
+
+
+# Every statement of a package sees the entity_ids of a one-shot iterator
+def test_financial_package_with_generator_of_ids(tmp_path):
+    db_file = tmp_path / 'ferc6.sqlite'
+    make_synthetic_database(db_file, 'ferc6', n_entities=5, n_years=3, amendment_rate=0)
+    entity_ids = ['C000001', 'C000002']
+
+    expected = get_ferc6_financial_package(db_file, entity_ids)
+    package = get_ferc6_financial_package(db_file, (i for i in entity_ids))
+    threaded = get_ferc6_financial_package(db_file, iter(entity_ids), max_workers=2)
+
+    assert [len(df) for df in package] == [len(df) for df in expected] == [6, 6, 6]
+    assert [len(df) for df in threaded] == [6, 6, 6]
@@ -0,0 +1,83 @@
+'''
+Tests for the incremental sync of ferc_sync into the Parquet store.
+'''
+
+import sqlite3
+
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from ferc_benchmark import make_synthetic_database
+from ferc_parquet import read_statement
+from ferc_sync import sync_statements
+
+
+TABLE = 'income_statement_114_duration'
+
+
+# A later sync fills in a line item that was all NULL in the first sync
+def test_sync_into_previously_null_column(tmp_path):
+    db_file = tmp_path / 'ferc6.sqlite'
+    store_dir = tmp_path / 'store'
+    make_synthetic_database(db_file, 'ferc6', n_entities=5, n_years=2, amendment_rate=0)
+
+    conn = sqlite3.connect(db_file)
+    conn.execute(f'UPDATE {TABLE} SET miscellaneous_income = NULL')
+    conn.execute(f"CREATE TABLE held AS SELECT * FROM {TABLE} WHERE entity_id = 'C000004'")
+    conn.execute(f"DELETE FROM {TABLE} WHERE entity_id = 'C000004'")
+    conn.commit()
+
+    sync_statements(db_file, 'ferc6', store_dir, ['income_statement'])
+
+    conn.execute(f'INSERT INTO {TABLE} SELECT * FROM held')
+    conn.execute(f"UPDATE {TABLE} SET miscellaneous_income = 1234.0 WHERE entity_id = 'C000004'")
+    conn.commit()
+    conn.close()
+
+    summary = sync_statements(db_file, 'ferc6', store_dir, ['income_statement'])
+    df = read_statement(store_dir, 'ferc6', 'income_statement')
+
+    assert summary['income_statement']['new_filings'] == 2
+    assert len(df) == 10
+    assert df.loc[df['entity_id'] == 'C000004', 'miscellaneous_income'].tolist() == [1234.0, 1234.0]
+    assert df.loc[df['entity_id'] != 'C000004', 'miscellaneous_income'].isna().all()
+
+
+# Only new filings and late amendments are copied by a later sync
+def test_sync_copies_new_filings_and_amendments(tmp_path):
+    db_file = tmp_path / 'ferc6.sqlite'
+    store_dir = tmp_path / 'store'
+    make_synthetic_database(db_file, 'ferc6', n_entities=5, n_years=2, amendment_rate=0)
+    first = sync_statements(db_file, 'ferc6', store_dir, ['income_statement'])
+
+    conn = sqlite3.connect(db_file)
+    # A new filing after the high-water mark, and an amendment published before it
+    conn.execute(
+        f"INSERT INTO {TABLE} SELECT * FROM {TABLE} WHERE entity_id = 'C000001' "
+        "AND end_date LIKE '2020%'"
+    )
+    conn.execute(
+        f"UPDATE {TABLE} SET filing_name = 'Late_form6_Q4_1', "
+        "publication_time = '2099-01-01 00:00:00.000000' "
+        f"WHERE rowid = (SELECT MAX(rowid) FROM {TABLE})"
+    )
+    conn.execute(
+        f"INSERT INTO {TABLE} SELECT * FROM {TABLE} WHERE entity_id = 'C000002' "
+        "AND end_date LIKE '2019%'"
+    )
+    conn.execute(
+        f"UPDATE {TABLE} SET filing_name = 'Amended_form6_Q4_2', "
+        "publication_time = '2000-01-01 00:00:00.000000' "
+        f"WHERE rowid = (SELECT MAX(rowid) FROM {TABLE})"
+    )
+    conn.commit()
+    conn.close()
+
+    second = sync_statements(db_file, 'ferc6', store_dir, ['income_statement'])
+    df = read_statement(store_dir, 'ferc6', 'income_statement')
+
+    assert second['income_statement']['new_filings'] == 2
+    assert second['income_statement']['rows'] == 2
+    assert len(df) == first['income_statement']['rows'] + 2
+    assert set(df['filing_name']) >= {'Late_form6_Q4_1', 'Amended_form6_Q4_2'}